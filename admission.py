@@ -0,0 +1,303 @@
+# admission.py
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import (
+    ADMISSION_PATHS,
+    ADMISSION_MAX_IN_FLIGHT,
+    ADMISSION_MAX_QUEUE,
+    ADMISSION_QUEUE_TIMEOUT,
+    RATE_LIMIT_PER_MINUTE,
+    RATE_LIMIT_BURST,
+    RATE_LIMIT_MAX_CLIENTS,
+    RATE_LIMIT_API_KEYS,
+    RATE_LIMIT_TRUST_FORWARDED,
+    SHARED_STATE_BACKEND,
+    SHARED_STATE_PATH,
+    WEB_CONCURRENCY,
+)
+from metrics import registry
+from shared_state import SQLiteDatabase
+
+logger = logging.getLogger(__name__)
+
+admission_queue_seconds = registry.histogram(
+    "admission_queue_seconds", "Time chat requests waited for an in-flight slot."
+)
+admission_rejections_total = registry.counter(
+    "admission_rejections_total", "Chat requests rejected with 429 by reason."
+)
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+def _refill(tokens: float, updated_at: float, now: float, rate: float, burst: float) -> Tuple[float, float]:
+    """
+    Token bucket step: (tokens left, seconds to wait), taking a token if one is available.
+    """
+    tokens = min(burst, tokens + max(0.0, now - updated_at) * rate)
+    if tokens >= 1.0:
+        return tokens - 1.0, 0.0
+    return tokens, (1.0 - tokens) / rate
+
+
+class RateLimiter:
+    """
+    One token bucket per client, refilled continuously, held in this process.
+    Buckets of the least recently seen clients are dropped beyond max_clients;
+    a dropped bucket comes back full, which only ever errs towards admitting.
+    """
+
+    def __init__(
+        self,
+        per_minute: float = RATE_LIMIT_PER_MINUTE,
+        burst: int = RATE_LIMIT_BURST,
+        max_clients: int = RATE_LIMIT_MAX_CLIENTS,
+    ):
+        self.rate = per_minute / 60.0
+        self.burst = float(burst)
+        self.max_clients = max_clients
+        # client -> (tokens, updated_at)
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    async def take(self, client: str) -> float:
+        """
+        Takes a token; returns 0.0, or the seconds until one is available.
+        """
+        now = time.monotonic()
+        tokens, updated_at = self._buckets.get(client, (self.burst, now))
+        tokens, wait = _refill(tokens, updated_at, now, self.rate, self.burst)
+        self._buckets[client] = (tokens, now)
+        self._buckets.move_to_end(client)
+        while len(self._buckets) > self.max_clients:
+            self._buckets.popitem(last=False)
+        return wait
+
+    def close(self) -> None:
+        pass
+
+
+class SQLiteRateLimiter(RateLimiter):
+    """
+    RateLimiter whose buckets live in the shared SQLite state, so a client
+    gets the configured rate across all workers together.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS rate_buckets (
+            client TEXT PRIMARY KEY,
+            tokens REAL NOT NULL,
+            updated_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS rate_buckets_updated_at ON rate_buckets (updated_at);
+    """
+
+    def __init__(
+        self,
+        per_minute: float = RATE_LIMIT_PER_MINUTE,
+        burst: int = RATE_LIMIT_BURST,
+        path: str = SHARED_STATE_PATH,
+    ):
+        super().__init__(per_minute, burst)
+        self._db = SQLiteDatabase(path, self.SCHEMA)
+
+    def _take(self, client: str) -> float:
+        now = time.time()
+        with self._db.transaction() as conn:
+            row = conn.execute("SELECT tokens, updated_at FROM rate_buckets WHERE client = ?", (client,)).fetchone()
+            tokens, updated_at = row if row is not None else (self.burst, now)
+            tokens, wait = _refill(tokens, updated_at, now, self.rate, self.burst)
+            conn.execute(
+                "INSERT OR REPLACE INTO rate_buckets (client, tokens, updated_at) VALUES (?, ?, ?)",
+                (client, tokens, now),
+            )
+        if self._db.maintenance_due():
+            # A bucket untouched this long has refilled completely, same as having no row
+            with self._db.transaction() as conn:
+                conn.execute("DELETE FROM rate_buckets WHERE updated_at < ?", (now - self.burst / self.rate,))
+        return wait
+
+    async def take(self, client: str) -> float:
+        return await asyncio.to_thread(self._take, client)
+
+    def close(self) -> None:
+        self._db.close()
+
+
+def create_rate_limiter(backend: str = SHARED_STATE_BACKEND) -> Optional[RateLimiter]:
+    if RATE_LIMIT_PER_MINUTE <= 0:
+        return None
+    if backend == "sqlite":
+        return SQLiteRateLimiter()
+    # Process-local buckets: each worker enforces its share of the limit
+    return RateLimiter(
+        per_minute=RATE_LIMIT_PER_MINUTE / WEB_CONCURRENCY,
+        burst=max(1, RATE_LIMIT_BURST // WEB_CONCURRENCY),
+    )
+
+
+class AdmissionController:
+    """
+    Caps concurrent chat requests. Up to max_queue requests wait (at most
+    queue_timeout) for a slot; the rest are rejected at once, so admitted
+    requests are not slowed down by an unbounded backlog.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int = ADMISSION_MAX_IN_FLIGHT,
+        max_queue: int = ADMISSION_MAX_QUEUE,
+        queue_timeout: float = ADMISSION_QUEUE_TIMEOUT,
+    ):
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.in_flight = 0
+        self.waiting = 0
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    async def acquire(self) -> None:
+        if self._slots is None:
+            # Created lazily so it binds to the serving event loop
+            self._slots = asyncio.Semaphore(self.max_in_flight)
+        started = time.perf_counter()
+        if self._slots.locked():
+            if self.waiting >= self.max_queue:
+                raise AdmissionRejected("queue_full", self.queue_timeout)
+            self.waiting += 1
+            try:
+                await asyncio.wait_for(self._slots.acquire(), self.queue_timeout)
+            except asyncio.TimeoutError:
+                raise AdmissionRejected("queue_timeout", self.queue_timeout) from None
+            finally:
+                self.waiting -= 1
+        else:
+            await self._slots.acquire()
+        self.in_flight += 1
+        admission_queue_seconds.observe(time.perf_counter() - started)
+
+    def release(self) -> None:
+        self.in_flight -= 1
+        self._slots.release()
+
+    def metric_lines(self) -> List[str]:
+        return [
+            "# HELP admission_in_flight Chat requests currently being served.",
+            "# TYPE admission_in_flight gauge",
+            f"admission_in_flight {self.in_flight}",
+            "# HELP admission_waiting Chat requests waiting for a slot.",
+            "# TYPE admission_waiting gauge",
+            f"admission_waiting {self.waiting}",
+        ]
+
+
+# Only digests are kept, so the configured keys are not held in memory
+_API_KEY_DIGESTS = frozenset(hashlib.sha256(key.encode("utf-8")).hexdigest() for key in RATE_LIMIT_API_KEYS)
+
+
+def client_key(
+    scope: Dict[str, Any],
+    trust_forwarded: bool = RATE_LIMIT_TRUST_FORWARDED,
+    api_key_digests: frozenset = _API_KEY_DIGESTS,
+) -> str:
+    """
+    The API key when it is one of the configured keys, else the client IP.
+    Unknown keys are ignored, so rotating made-up keys cannot dodge the limit.
+    """
+    headers = dict(scope.get("headers") or [])
+    api_key = headers.get(b"x-api-key")
+    if api_key is None:
+        authorization = headers.get(b"authorization", b"")
+        if authorization.lower().startswith(b"bearer "):
+            api_key = authorization[7:].strip()
+    if api_key:
+        digest = hashlib.sha256(api_key).hexdigest()
+        if digest in api_key_digests:
+            return "key:" + digest[:16]
+    forwarded = headers.get(b"x-forwarded-for")
+    if trust_forwarded and forwarded:
+        return "ip:" + forwarded.split(b",")[0].strip().decode("latin-1")
+    client = scope.get("client")
+    return "ip:" + (client[0] if client else "unknown")
+
+
+class AdmissionMiddleware:
+    """
+    ASGI middleware applying the rate limiter and admission controller to the
+    chat endpoints. The slot is held until the response, including a stream,
+    has been sent completely.
+    """
+
+    def __init__(
+        self,
+        app: Any,
+        paths: Tuple[str, ...] = ADMISSION_PATHS,
+        controller: Optional[AdmissionController] = None,
+        limiter: Optional[RateLimiter] = None,
+    ):
+        self.app = app
+        self.paths = frozenset(paths)
+        self.controller = controller or admission_controller
+        self.limiter = limiter if limiter is not None else rate_limiter
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            if self.limiter is not None:
+                wait = await self._take(client_key(scope))
+                if wait > 0:
+                    raise AdmissionRejected("rate_limited", wait)
+            await self.controller.acquire()
+        except AdmissionRejected as e:
+            admission_rejections_total.inc(reason=e.reason)
+            await self._reject(send, e)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release()
+
+    async def _take(self, client: str) -> float:
+        try:
+            return await self.limiter.take(client)
+        except Exception as e:
+            # Fail open: a shared-state hiccup should not turn into a 500 for every chat
+            logger.warning(f"Rate limiter unavailable, admitting request: {e}")
+            return 0.0
+
+    async def _reject(self, send: Any, rejection: AdmissionRejected) -> None:
+        if rejection.reason == "rate_limited":
+            detail = "Too many requests from this client, slow down."
+        else:
+            detail = "The agent is at capacity, try again shortly."
+        body = json.dumps({"detail": detail}).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode("latin-1")),
+                (b"retry-after", str(max(1, math.ceil(rejection.retry_after))).encode("latin-1")),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+admission_controller = AdmissionController()
+registry.add_collector(admission_controller.metric_lines)
+rate_limiter = create_rate_limiter()
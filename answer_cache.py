@@ -0,0 +1,178 @@
+# answer_cache.py
+import logging
+import re
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from retrieval import tokenize
+from metrics import registry
+from shared_state import SharedCache, shared_cache
+from config import (
+    ANSWER_CACHE_ENABLED,
+    ANSWER_CACHE_MAX_ENTRIES,
+    ANSWER_CACHE_TTL,
+    ANSWER_CACHE_SEMANTIC,
+    ANSWER_CACHE_SIMILARITY,
+    ANSWER_CACHE_DIM,
+)
+
+logger = logging.getLogger(__name__)
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+answer_cache_lookups_total = registry.counter("answer_cache_lookups_total", "Answer cache lookups by result.")
+
+
+def normalize_question(text: str) -> str:
+    return " ".join(_WORD_RE.findall(text.lower()))
+
+
+def cacheable_question(messages: List[Dict[str, Any]]) -> Optional[str]:
+    """
+    The question to cache on, or None. Only single-message conversations are
+    cacheable, since a cached answer cannot depend on earlier turns.
+    """
+    if len(messages) != 1:
+        return None
+    message = messages[0]
+    if message.get("role") != "user" or not isinstance(message.get("content"), str):
+        return None
+    question = normalize_question(message["content"])
+    return question or None
+
+
+def embed(question: str, dim: int = ANSWER_CACHE_DIM) -> np.ndarray:
+    """
+    L2-normalized hashed bag of words (unigrams and bigrams) for cosine similarity.
+    """
+    vector = np.zeros(dim, dtype=np.float32)
+    tokens = tokenize(question)
+    features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    for feature in features:
+        vector[zlib.crc32(feature.encode("utf-8")) % dim] += 1.0
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class AnswerCache:
+    """
+    TTL + LRU cache of LLM answers to tool-free questions, keyed by the
+    normalized question and the system prompt version. With semantic
+    matching on, a near-identical cached question (cosine similarity over
+    hashed bag-of-words vectors) also counts as a hit. With a shared cache,
+    exact answers are also reused across worker processes.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = ANSWER_CACHE_MAX_ENTRIES,
+        ttl: float = ANSWER_CACHE_TTL,
+        semantic: bool = ANSWER_CACHE_SEMANTIC,
+        similarity: float = ANSWER_CACHE_SIMILARITY,
+        dim: int = ANSWER_CACHE_DIM,
+        shared: Optional[SharedCache] = shared_cache,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.semantic = semantic
+        self.similarity = similarity
+        self.dim = dim
+        self.shared = shared
+        # (version, question) -> (expires_at, answer, slot)
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, str, int]]" = OrderedDict()
+        # Row i of the matrix embeds the entry whose key is _slot_keys[i]
+        self._vectors = np.zeros((max_entries, dim), dtype=np.float32) if semantic else None
+        self._slot_keys: List[Optional[Tuple[str, str]]] = [None] * max_entries
+        self._free_slots = list(range(max_entries - 1, -1, -1))
+
+    def get(self, question: str, version: str) -> Optional[str]:
+        answer, result = self._get(question, version)
+        answer_cache_lookups_total.inc(result=result)
+        return answer
+
+    async def fetch(self, question: str, version: str) -> Optional[str]:
+        """
+        Like get, but falls back to the cache shared between worker processes.
+        """
+        answer, result = self._get(question, version)
+        if answer is None and self.shared is not None:
+            try:
+                answer = await self.shared.get("answer", f"{version}:{question}")
+            except Exception as e:
+                logger.warning(f"Shared answer cache read failed: {e}")
+            if answer is not None:
+                result = "shared_hit"
+                self.put(question, version, answer)
+        answer_cache_lookups_total.inc(result=result)
+        return answer
+
+    async def store(self, question: str, version: str, answer: str) -> None:
+        """
+        Like put, but also publishes the answer to the other worker processes.
+        """
+        self.put(question, version, answer)
+        if answer and self.shared is not None:
+            try:
+                await self.shared.set("answer", f"{version}:{question}", answer, self.ttl)
+            except Exception as e:
+                logger.warning(f"Shared answer cache write failed: {e}")
+
+    def _get(self, question: str, version: str) -> Tuple[Optional[str], str]:
+        key = (version, question)
+        answer = self._lookup(key)
+        if answer is not None:
+            return answer, "hit"
+
+        if self.semantic and self._entries:
+            scores = self._vectors @ embed(question, self.dim)
+            slot = int(np.argmax(scores))
+            similar_key = self._slot_keys[slot]
+            if scores[slot] >= self.similarity and similar_key is not None and similar_key[0] == version:
+                answer = self._lookup(similar_key)
+                if answer is not None:
+                    return answer, "semantic_hit"
+
+        return None, "miss"
+
+    def _lookup(self, key: Tuple[str, str]) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] < time.monotonic():
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def put(self, question: str, version: str, answer: str) -> None:
+        if not answer:
+            return
+        key = (version, question)
+        if key in self._entries:
+            self._remove(key)
+        while len(self._entries) >= self.max_entries:
+            self._remove(next(iter(self._entries)))
+
+        slot = self._free_slots.pop()
+        self._slot_keys[slot] = key
+        if self._vectors is not None:
+            self._vectors[slot] = embed(question, self.dim)
+        self._entries[key] = (time.monotonic() + self.ttl, answer, slot)
+
+    def _remove(self, key: Tuple[str, str]) -> None:
+        _, _, slot = self._entries.pop(key)
+        self._slot_keys[slot] = None
+        if self._vectors is not None:
+            self._vectors[slot] = 0.0
+        self._free_slots.append(slot)
+
+    def clear(self) -> None:
+        for key in list(self._entries):
+            self._remove(key)
+
+
+answer_cache = AnswerCache() if ANSWER_CACHE_ENABLED else None
@@ -0,0 +1 @@
+# Offline benchmark harness: mock OpenAI / scoring servers and a load generator
@@ -0,0 +1,242 @@
+# benchmarks/load.py
+"""
+Load generator for the agent's request path.
+
+Reports p50/p95/p99 latency and requests/sec for /chat, /scoring/example and
+in-process tool dispatch at several concurrency levels.
+
+    # Start mock OpenAI + scoring servers and the app locally, then measure
+    python -m benchmarks.load --spawn
+
+    # Measure an already running deployment
+    python -m benchmarks.load --target http://127.0.0.1:8000 --scenarios chat,scoring
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict, Iterator, List
+
+import httpx
+import numpy as np
+
+from benchmarks.mock_openai import SAMPLE_ARGUMENTS
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHAT_PROMPTS = [
+    "What is invoice finance?",
+    "Give me a nano score for a 30 year old male in tech in addis_ababa",
+    "I am a farmer, score me for agtech",
+    "Score me for micro and agtech",
+]
+
+SCORE_REQUEST = {"gender": "male", "age": 30, "business_sector": "tech", "region": "california"}
+
+
+def summarize(scenario: str, concurrency: int, latencies: List[float], errors: int, elapsed: float) -> Dict[str, Any]:
+    values = np.array(latencies) * 1000.0 if latencies else np.zeros(1)
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {
+        "scenario": scenario,
+        "concurrency": concurrency,
+        "requests": len(latencies) + errors,
+        "errors": errors,
+        "rps": (len(latencies) + errors) / elapsed if elapsed > 0 else 0.0,
+        "p50_ms": float(p50),
+        "p95_ms": float(p95),
+        "p99_ms": float(p99),
+    }
+
+
+async def run_load(request: Callable[[int], Awaitable[bool]], concurrency: int, total: int):
+    """
+    Runs `total` requests with `concurrency` workers; returns (latencies, errors, elapsed).
+    """
+    counter = itertools.count()
+    latencies: List[float] = []
+    errors = 0
+
+    async def worker():
+        nonlocal errors
+        while True:
+            i = next(counter)
+            if i >= total:
+                return
+            started = time.perf_counter()
+            try:
+                ok = await request(i)
+            except Exception:
+                ok = False
+            if ok:
+                latencies.append(time.perf_counter() - started)
+            else:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, errors, time.perf_counter() - started
+
+
+async def bench_http(target: str, scenario: str, concurrency: int, total: int) -> Dict[str, Any]:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=target, limits=limits, timeout=120.0) as client:
+        async def chat(i: int) -> bool:
+            prompt = CHAT_PROMPTS[i % len(CHAT_PROMPTS)]
+            response = await client.post("/chat", json={"messages": [{"role": "user", "content": prompt}]})
+            return response.status_code == 200
+
+        async def scoring(i: int) -> bool:
+            response = await client.post("/scoring/example", json={**SCORE_REQUEST, "age": 18 + i % 50})
+            return response.status_code == 200
+
+        request = {"chat": chat, "scoring": scoring}[scenario]
+        latencies, errors, elapsed = await run_load(request, concurrency, total)
+    return summarize(scenario, concurrency, latencies, errors, elapsed)
+
+
+async def bench_dispatch(concurrency: int, total: int) -> Dict[str, Any]:
+    # Imported late so SCORING_*_URL set by --spawn apply to the scoring clients
+    from openai.types.chat import ChatCompletionMessageToolCall
+    from utils import handle_function_calls
+    from score_cache import score_cache
+
+    def tool_call(i: int, name: str) -> ChatCompletionMessageToolCall:
+        args = dict(SAMPLE_ARGUMENTS[name])
+        if "age" in args:
+            args["age"] = 18 + i % 50
+        return ChatCompletionMessageToolCall(
+            id=f"call_{i}_{name}", type="function",
+            function={"name": name, "arguments": json.dumps(args)},
+        )
+
+    async def dispatch(i: int) -> bool:
+        results = await handle_function_calls([tool_call(i, "nano"), tool_call(i, "agtech")])
+        return not any(isinstance(result, str) and result.startswith("Error") for result in results)
+
+    score_cache.clear()
+    latencies, errors, elapsed = await run_load(dispatch, concurrency, total)
+    return summarize("dispatch", concurrency, latencies, errors, elapsed)
+
+
+def _wait_ready(url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(url, timeout=1.0).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"{url} did not become ready within {timeout}s")
+
+
+@contextmanager
+def spawn_stack(args: argparse.Namespace) -> Iterator[str]:
+    """
+    Starts the mock OpenAI server, mock scoring backends and the app; yields the app URL.
+    """
+    openai_url = f"http://127.0.0.1:{args.port + 1}"
+    scoring_url = f"http://127.0.0.1:{args.port + 2}"
+    app_url = f"http://127.0.0.1:{args.port}"
+    env = {
+        **os.environ,
+        "MOCK_OPENAI_DELAY": str(args.openai_delay),
+        "MOCK_SCORING_DELAY": str(args.scoring_delay),
+        "OPENAI_API_KEY": "sk-mock",
+        "OPENAI_BASE_URL": f"{openai_url}/v1",
+        "SCORING_MICRO_URL": f"{scoring_url}/micro",
+        "SCORING_NANO_URL": f"{scoring_url}/nano",
+        "SCORING_AGTECH_URL": f"{scoring_url}/agtech",
+        "HISTORY_PATH": os.path.join(tempfile.mkdtemp(prefix="bench-history-"), "history.jsonl"),
+        # All load comes from one address; measure the service, not the per-client limit
+        "RATE_LIMIT_PER_MINUTE": os.environ.get("RATE_LIMIT_PER_MINUTE", "0"),
+        # The prompts and mock tool arguments repeat, so caches would turn most requests into hits
+        "ANSWER_CACHE_ENABLED": os.environ.get("ANSWER_CACHE_ENABLED", "0"),
+        **{
+            f"SCORE_CACHE_TTL_{name.upper()}": os.environ.get(f"SCORE_CACHE_TTL_{name.upper()}", "0")
+            for name in ("micro", "nano", "agtech")
+        },
+    }
+    # The in-process dispatch scenario talks to the same mocks, with the same cache settings
+    os.environ.update({
+        key: env[key]
+        for key in env
+        if key.startswith("SCORING_") and key.endswith("_URL") or key.startswith("SCORE_CACHE_TTL_")
+    })
+
+    def uvicorn(app: str, port: int) -> subprocess.Popen:
+        return subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", app, "--port", str(port), "--log-level", "warning"],
+            cwd=REPO_ROOT, env=env,
+        )
+
+    processes = [
+        uvicorn("benchmarks.mock_openai:app", args.port + 1),
+        uvicorn("benchmarks.mock_scoring:app", args.port + 2),
+        uvicorn("main:app", args.port),
+    ]
+    try:
+        for url in (f"{openai_url}/docs", f"{scoring_url}/docs", f"{app_url}/kyc/example"):
+            _wait_ready(url)
+        yield app_url
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait(timeout=10)
+
+
+async def run_benchmarks(target: str, args: argparse.Namespace) -> List[Dict[str, Any]]:
+    results = []
+    for scenario in args.scenarios:
+        for concurrency in args.concurrency:
+            if scenario == "dispatch":
+                result = await bench_dispatch(concurrency, args.requests)
+            else:
+                result = await bench_http(target, scenario, concurrency, args.requests)
+            print(
+                f"{result['scenario']:<10} c={result['concurrency']:<4} n={result['requests']:<6} "
+                f"err={result['errors']:<4} rps={result['rps']:>8.1f}  "
+                f"p50={result['p50_ms']:>8.1f}ms  p95={result['p95_ms']:>8.1f}ms  p99={result['p99_ms']:>8.1f}ms",
+                flush=True,
+            )
+            results.append(result)
+    return results
+
+
+def parse_args(argv: List[str] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the agent request path")
+    parser.add_argument("--target", default=None, help="Base URL of a running app (ignored with --spawn)")
+    parser.add_argument("--spawn", action="store_true", help="Start mock backends and the app locally")
+    parser.add_argument("--port", type=int, default=9100, help="App port with --spawn; mocks use the next two")
+    parser.add_argument("--scenarios", type=lambda s: s.split(","), default=["chat", "scoring", "dispatch"])
+    parser.add_argument("--concurrency", type=lambda s: [int(c) for c in s.split(",")], default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=200, help="Requests per scenario and concurrency level")
+    parser.add_argument("--openai-delay", type=float, default=0.5)
+    parser.add_argument("--scoring-delay", type=float, default=0.2)
+    parser.add_argument("--json", dest="json_path", default=None, help="Also write results to this JSON file")
+    return parser.parse_args(argv)
+
+
+def main(argv: List[str] = None) -> None:
+    args = parse_args(argv)
+    if args.spawn:
+        with spawn_stack(args) as target:
+            results = asyncio.run(run_benchmarks(target, args))
+    else:
+        results = asyncio.run(run_benchmarks(args.target or "http://127.0.0.1:8000", args))
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as file:
+            json.dump(results, file, indent=4)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+# benchmarks/mock_openai.py
+"""
+Local stand-in for the OpenAI chat completions API.
+
+Turns with tools enabled whose latest user message mentions a scoring
+product get a scripted tool call; everything else gets a short text answer.
+Delays are configurable so the agent can be measured under realistic LLM latency:
+
+    MOCK_OPENAI_DELAY        seconds before a response (or the first chunk)
+    MOCK_OPENAI_TOKEN_DELAY  seconds between streamed chunks
+"""
+import asyncio
+import json
+import os
+import time
+import uuid
+from typing import Any, Dict, List
+
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+
+DELAY = float(os.getenv("MOCK_OPENAI_DELAY", "0.5"))
+TOKEN_DELAY = float(os.getenv("MOCK_OPENAI_TOKEN_DELAY", "0.01"))
+
+SAMPLE_ARGUMENTS = {
+    "nano": {"gender": "male", "age": 30, "business_sector": "tech", "region": "addis_ababa"},
+    "micro": {
+        "product_type": "safee_micro", "business_region": "addis_ababa", "business_subcity": "Bole",
+        "business_woreda": "07", "business_level": "startup", "business_number_of_employees": 3,
+        "business_source_of_initial_capital": "own", "business_sector": "building_and_construction",
+        "business_annual_income": 500000, "business_association_type": "own",
+        "business_starting_capital": 100000, "business_current_capital": 200000,
+        "business_annual_profit": 150000, "business_establishment_year": "2015",
+        "business_monthly_income": 4000, "business_description": "small shop", "customer_age": 25,
+        "customer_level_of_education": "bachelors", "customer_gender": "f",
+        "customer_marital_status": "married", "customer_document_type": "PASSPORT",
+    },
+    "agtech": {
+        "region": "Afar", "latitude": 8.6, "longitude": 36.5, "land_area": 2,
+        "crop_type": "potato", "yield_estimation_year": 2025,
+    },
+}
+
+TOOL_KEYWORDS = {
+    "nano": ("nano",),
+    "micro": ("micro",),
+    "agtech": ("agtech", "farmer"),
+}
+
+ANSWER = "Kifiya builds AI-driven credit scoring and lending infrastructure for underserved markets."
+
+app = FastAPI()
+
+
+def _scripted_tool_calls(body: Dict[str, Any]) -> List[Dict[str, Any]]:
+    messages = body.get("messages", [])
+    if not body.get("tools") or not messages or messages[-1].get("role") != "user":
+        return []
+    content = (messages[-1].get("content") or "").lower()
+    return [
+        {
+            "id": f"call_{uuid.uuid4().hex[:12]}",
+            "type": "function",
+            "function": {"name": name, "arguments": json.dumps(SAMPLE_ARGUMENTS[name])},
+        }
+        for name, keywords in TOOL_KEYWORDS.items()
+        if any(keyword in content for keyword in keywords)
+    ]
+
+
+def _usage(body: Dict[str, Any], completion: str) -> Dict[str, int]:
+    prompt_tokens = len(json.dumps(body.get("messages", []))) // 4
+    completion_tokens = len(completion) // 4 + 1
+    return {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens, "total_tokens": prompt_tokens + completion_tokens}
+
+
+def _chunk(completion_id: str, model: str, delta: Dict[str, Any], finish_reason: Any = None) -> str:
+    chunk = {
+        "id": completion_id,
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+    }
+    return f"data: {json.dumps(chunk)}\n\n"
+
+
+async def _stream(body: Dict[str, Any], completion_id: str, model: str, tool_calls: List[Dict[str, Any]]):
+    await asyncio.sleep(DELAY)
+    completion = ""
+    if tool_calls:
+        fragments = [{"index": i, **call} for i, call in enumerate(tool_calls)]
+        yield _chunk(completion_id, model, {"role": "assistant", "content": None, "tool_calls": fragments})
+        yield _chunk(completion_id, model, {}, "tool_calls")
+    else:
+        yield _chunk(completion_id, model, {"role": "assistant", "content": ""})
+        for word in ANSWER.split(" "):
+            await asyncio.sleep(TOKEN_DELAY)
+            yield _chunk(completion_id, model, {"content": word + " "})
+        yield _chunk(completion_id, model, {}, "stop")
+        completion = ANSWER
+    if (body.get("stream_options") or {}).get("include_usage"):
+        usage_chunk = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [],
+            "usage": _usage(body, completion),
+        }
+        yield f"data: {json.dumps(usage_chunk)}\n\n"
+    yield "data: [DONE]\n\n"
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    model = body.get("model", "gpt-4")
+    completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+    tool_calls = _scripted_tool_calls(body)
+
+    if body.get("stream"):
+        return StreamingResponse(_stream(body, completion_id, model, tool_calls), media_type="text/event-stream")
+
+    await asyncio.sleep(DELAY)
+    message: Dict[str, Any] = {"role": "assistant", "content": None if tool_calls else ANSWER}
+    if tool_calls:
+        message["tool_calls"] = tool_calls
+    return {
+        "id": completion_id,
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "message": message, "finish_reason": "tool_calls" if tool_calls else "stop"}],
+        "usage": _usage(body, message["content"] or ""),
+    }
@@ -0,0 +1,33 @@
+# benchmarks/mock_scoring.py
+"""
+Local stand-in for the micro, nano and agtech scoring backends.
+
+    MOCK_SCORING_DELAY  seconds each score takes
+"""
+import asyncio
+import os
+from typing import Any, Dict
+
+from fastapi import FastAPI
+
+DELAY = float(os.getenv("MOCK_SCORING_DELAY", "0.2"))
+
+app = FastAPI()
+
+
+@app.post("/micro")
+async def micro(payload: Dict[str, Any]):
+    await asyncio.sleep(DELAY)
+    return {"score": 612, "model": "Mock Micro Model", "product_type": payload.get("product_type")}
+
+
+@app.post("/nano")
+async def nano(payload: Dict[str, Any]):
+    await asyncio.sleep(DELAY)
+    return {"score": 480, "model": "Mock Nano Model", "user_id": f"cust_{payload.get('gender')}_{payload.get('age')}"}
+
+
+@app.post("/agtech")
+async def agtech(payload: Dict[str, Any]):
+    await asyncio.sleep(DELAY)
+    return {"score": 701, "model": "Mock AgTech Model", "region": payload.get("agriFinance", {}).get("region")}
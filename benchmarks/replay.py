@@ -0,0 +1,274 @@
+# benchmarks/replay.py
+"""
+Offline analysis and replay of the conversation history log.
+
+Streams the history (JSONL log or legacy JSON array) one conversation at a
+time and reports per-tool call frequency, prompt size distribution and
+repeated-question rates, to size caches and context budgets from real
+traffic. With --replay the conversations are also sent to the agent, by
+default against the mock OpenAI and scoring backends, to reproduce latency.
+
+    python -m benchmarks.replay
+    python -m benchmarks.replay --history kb/conversation_history.json --top 20
+    python -m benchmarks.replay --replay --spawn --concurrency 8
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, List, Optional
+
+import httpx
+import pandas as pd
+
+from config import HISTORY_PATH, LEGACY_HISTORY_PATH, CONTEXT_TOKEN_BUDGET
+from history import iter_history, iter_legacy_history
+from answer_cache import normalize_question
+from context_window import count_message_tokens
+from benchmarks.load import spawn_stack, summarize
+
+PERCENTILES = [0.5, 0.9, 0.95, 0.99]
+
+
+def iter_conversations(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Streams entries from either log format, picked by extension.
+    """
+    if path.endswith(".jsonl"):
+        return iter_history(path)
+    return iter_legacy_history(path)
+
+
+def default_history_path() -> str:
+    return HISTORY_PATH if os.path.exists(HISTORY_PATH) else LEGACY_HISTORY_PATH
+
+
+def _text(content: Any) -> str:
+    if content is None or isinstance(content, str):
+        return content or ""
+    return json.dumps(content, ensure_ascii=False)
+
+
+def conversation_row(entry: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    The per-conversation facts the report needs; the messages themselves are not kept.
+    """
+    messages = entry.get("messages") or []
+    tools = [
+        (tool_call.get("function") or {}).get("name") or "unknown"
+        for message in messages
+        for tool_call in message.get("tool_calls") or []
+    ]
+    user_messages = [_text(message.get("content")) for message in messages if message.get("role") == "user"]
+    conversation_messages = sum(1 for message in messages if message.get("role") != "system")
+    return {
+        "messages": conversation_messages,
+        "user_turns": len(user_messages),
+        "system_chars": sum(len(_text(message.get("content"))) for message in messages if message.get("role") == "system"),
+        "prompt_chars": sum(len(_text(message.get("content"))) for message in messages),
+        "prompt_tokens": sum(
+            count_message_tokens({**message, "content": _text(message.get("content"))}) for message in messages
+        ),
+        "tools": tools,
+        "question": normalize_question(user_messages[-1]) if user_messages else "",
+        # The answer cache only serves single-question conversations answered without tools
+        "cache_eligible": conversation_messages == 1 and len(user_messages) == 1,
+        "response_chars": len(_text(entry.get("response"))),
+    }
+
+
+def load_frame(path: str, limit: Optional[int] = None) -> pd.DataFrame:
+    rows = []
+    for entry in iter_conversations(path):
+        rows.append(conversation_row(entry))
+        if limit is not None and len(rows) >= limit:
+            break
+    return pd.DataFrame(rows, columns=[
+        "messages", "user_turns", "system_chars", "prompt_chars", "prompt_tokens",
+        "tools", "question", "cache_eligible", "response_chars",
+    ])
+
+
+def lru_hit_rate(questions: List[str], size: int) -> float:
+    """
+    Hit rate an LRU of `size` entries would have had over this question sequence.
+    """
+    cache: "OrderedDict[str, None]" = OrderedDict()
+    hits = 0
+    for question in questions:
+        if question in cache:
+            hits += 1
+            cache.move_to_end(question)
+            continue
+        cache[question] = None
+        if len(cache) > size:
+            cache.popitem(last=False)
+    return hits / len(questions) if questions else 0.0
+
+
+def analyze(frame: pd.DataFrame, top: int = 10, cache_sizes: List[int] = (64, 256, 1024)) -> Dict[str, Any]:
+    total = len(frame)
+    calls = frame["tools"].explode().dropna()
+    tool_counts = calls.value_counts()
+    tool_conversations = frame["tools"].map(lambda names: sorted(set(names))).explode().dropna().value_counts()
+
+    sizes = frame[["messages", "prompt_chars", "prompt_tokens", "response_chars"]].quantile(PERCENTILES)
+    sizes.loc["max"] = frame[["messages", "prompt_chars", "prompt_tokens", "response_chars"]].max()
+
+    asked = frame.loc[frame["question"] != "", "question"]
+    question_counts = asked.value_counts()
+    eligible = frame.loc[frame["cache_eligible"] & frame["tools"].map(len).eq(0) & (frame["question"] != ""), "question"]
+
+    return {
+        "conversations": total,
+        "with_tools": float((frame["tools"].map(len) > 0).mean()) if total else 0.0,
+        "tools": {
+            name: {
+                "calls": int(tool_counts[name]),
+                "conversations": int(tool_conversations.get(name, 0)),
+                "share_of_calls": float(tool_counts[name] / len(calls)),
+            }
+            for name in tool_counts.index
+        },
+        "prompt_sizes": {
+            str(index): {column: float(value) for column, value in row.items()}
+            for index, row in sizes.iterrows()
+        },
+        "over_token_budget": float((frame["prompt_tokens"] > CONTEXT_TOKEN_BUDGET).mean()) if total else 0.0,
+        "questions": {
+            "asked": int(len(asked)),
+            "unique": int(question_counts.size),
+            "repeated_rate": float(1 - question_counts.size / len(asked)) if len(asked) else 0.0,
+            "cache_eligible": int(len(eligible)),
+            "cache_eligible_repeated_rate": float(1 - eligible.nunique() / len(eligible)) if len(eligible) else 0.0,
+            "lru_hit_rate": {str(size): lru_hit_rate(eligible.tolist(), size) for size in cache_sizes},
+            "top": [
+                {"question": question, "count": int(count)}
+                for question, count in question_counts[question_counts > 1].head(top).items()
+            ],
+        },
+    }
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    print(f"conversations      {report['conversations']}")
+    print(f"with tool calls    {report['with_tools']:.1%}")
+    print(f"over token budget  {report['over_token_budget']:.1%}  (CONTEXT_TOKEN_BUDGET={CONTEXT_TOKEN_BUDGET})")
+
+    print(f"\n{'tool':<12} {'calls':>7} {'convs':>7} {'share':>7}")
+    for name, stats in report["tools"].items():
+        print(f"{name:<12} {stats['calls']:>7} {stats['conversations']:>7} {stats['share_of_calls']:>7.1%}")
+
+    print(f"\n{'':<6} {'messages':>9} {'chars':>9} {'tokens':>9} {'resp chars':>11}")
+    for index, row in report["prompt_sizes"].items():
+        label = index if index == "max" else f"p{float(index) * 100:g}"
+        print(
+            f"{label:<6} {row['messages']:>9.0f} {row['prompt_chars']:>9.0f} "
+            f"{row['prompt_tokens']:>9.0f} {row['response_chars']:>11.0f}"
+        )
+
+    questions = report["questions"]
+    print(f"\nquestions asked    {questions['asked']} ({questions['unique']} unique)")
+    print(f"repeated rate      {questions['repeated_rate']:.1%}")
+    print(
+        f"cache eligible     {questions['cache_eligible']} "
+        f"(repeated {questions['cache_eligible_repeated_rate']:.1%})"
+    )
+    for size, rate in questions["lru_hit_rate"].items():
+        print(f"  LRU {size:>6} hit rate {rate:.1%}")
+    for row in questions["top"]:
+        print(f"  {row['count']:>5}x  {row['question'][:80]}")
+
+
+def replay_payload(entry: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    The request the client originally sent: user and plain assistant turns up to
+    the last user message. System prompts and tool traffic are rebuilt server-side.
+    """
+    messages = [
+        {"role": message["role"], "content": message["content"]}
+        for message in entry.get("messages") or []
+        if message.get("role") in ("user", "assistant")
+        and not message.get("tool_calls")
+        and isinstance(message.get("content"), str)
+    ]
+    while messages and messages[-1]["role"] != "user":
+        messages.pop()
+    return {"messages": messages} if messages else None
+
+
+async def replay(target: str, path: str, concurrency: int, limit: Optional[int]) -> Dict[str, Any]:
+    payloads = (payload for payload in map(replay_payload, iter_conversations(path)) if payload is not None)
+    if limit is not None:
+        payloads = (payload for _, payload in zip(range(limit), payloads))
+    latencies: List[float] = []
+    errors = 0
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=target, limits=limits, timeout=120.0) as client:
+        async def worker():
+            nonlocal errors
+            # Workers pull from the shared generator, so the log is never held in memory
+            for payload in payloads:
+                started = time.perf_counter()
+                try:
+                    response = await client.post("/chat", json=payload)
+                    ok = response.status_code == 200
+                except httpx.HTTPError:
+                    ok = False
+                if ok:
+                    latencies.append(time.perf_counter() - started)
+                else:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize("replay", concurrency, latencies, errors, time.perf_counter() - started)
+
+
+def parse_args(argv: List[str] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Analyze and replay the conversation history log")
+    parser.add_argument("--history", default=None, help="JSONL log or legacy JSON array (default: the configured log)")
+    parser.add_argument("--limit", type=int, default=None, help="Only use the first N conversations")
+    parser.add_argument("--top", type=int, default=10, help="Repeated questions to list")
+    parser.add_argument("--cache-sizes", type=lambda s: [int(n) for n in s.split(",")], default=[64, 256, 1024])
+    parser.add_argument("--replay", action="store_true", help="Also send the conversations to the agent")
+    parser.add_argument("--target", default=None, help="Base URL of a running app (ignored with --spawn)")
+    parser.add_argument("--spawn", action="store_true", help="Start mock backends and the app locally")
+    parser.add_argument("--port", type=int, default=9100, help="App port with --spawn; mocks use the next two")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--openai-delay", type=float, default=0.5)
+    parser.add_argument("--scoring-delay", type=float, default=0.2)
+    parser.add_argument("--json", dest="json_path", default=None, help="Also write the report to this JSON file")
+    return parser.parse_args(argv)
+
+
+def main(argv: List[str] = None) -> None:
+    args = parse_args(argv)
+    path = args.history or default_history_path()
+    report = analyze(load_frame(path, args.limit), args.top, args.cache_sizes)
+    report["history"] = path
+    print_report(report)
+
+    if args.replay:
+        if args.spawn:
+            with spawn_stack(args) as target:
+                result = asyncio.run(replay(target, path, args.concurrency, args.limit))
+        else:
+            result = asyncio.run(replay(args.target or "http://127.0.0.1:8000", path, args.concurrency, args.limit))
+        print(
+            f"\nreplay     c={result['concurrency']:<4} n={result['requests']:<6} "
+            f"err={result['errors']:<4} rps={result['rps']:>8.1f}  "
+            f"p50={result['p50_ms']:>8.1f}ms  p95={result['p95_ms']:>8.1f}ms  p99={result['p99_ms']:>8.1f}ms"
+        )
+        report["replay"] = result
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as file:
+            json.dump(report, file, indent=4)
+
+
+if __name__ == "__main__":
+    main()
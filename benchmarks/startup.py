@@ -0,0 +1,141 @@
+# benchmarks/startup.py
+"""
+Cold-start benchmark for the app.
+
+Reports, over several fresh interpreters, the wall time of `import main`, the
+time until a uvicorn worker answers its first request, and the modules with
+the largest `python -X importtime` cost.
+
+    python -m benchmarks.startup
+    python -m benchmarks.startup --runs 10 --top 25 --json startup.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Tuple
+
+import httpx
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _env() -> Dict[str, str]:
+    return {
+        **os.environ,
+        "OPENAI_API_KEY": os.environ.get("OPENAI_API_KEY", "sk-mock"),
+        # Keep the real history log untouched
+        "HISTORY_PATH": os.path.join(tempfile.mkdtemp(prefix="bench-history-"), "history.jsonl"),
+    }
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int]]:
+    """
+    (module, self_us, cumulative_us) for each line of -X importtime output.
+    """
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((name.rstrip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def measure_import(module: str) -> Tuple[float, List[Tuple[str, int, int]]]:
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_ROOT, env=_env(), capture_output=True, text=True, check=True,
+    )
+    return time.perf_counter() - started, parse_importtime(completed.stderr)
+
+
+def measure_ready(app: str, port: int, timeout: float = 60.0) -> float:
+    """
+    Seconds from spawning a uvicorn worker until it serves its first request.
+    """
+    url = f"http://127.0.0.1:{port}/kyc/example"
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", app, "--port", str(port), "--log-level", "warning"],
+        cwd=REPO_ROOT, env=_env(), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            try:
+                if httpx.get(url, timeout=0.5).status_code == 200:
+                    return time.perf_counter() - started
+            except httpx.TransportError:
+                pass
+            time.sleep(0.01)
+        raise RuntimeError(f"{app} did not become ready within {timeout}s")
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+def _summary(samples: List[float]) -> Dict[str, float]:
+    return {
+        "median_ms": statistics.median(samples) * 1000,
+        "min_ms": min(samples) * 1000,
+        "max_ms": max(samples) * 1000,
+    }
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    import_times = []
+    rows: List[Tuple[str, int, int]] = []
+    for _ in range(args.runs):
+        elapsed, rows = measure_import(args.module)
+        import_times.append(elapsed)
+    ready_times = [measure_ready(f"{args.module}:app", args.port) for _ in range(args.runs)]
+
+    result = {
+        "module": args.module,
+        "runs": args.runs,
+        "import": _summary(import_times),
+        "ready": _summary(ready_times),
+        # From the last run; self time is what each module costs on its own
+        "top_modules": [
+            {"module": name.strip(), "self_ms": self_us / 1000, "cumulative_ms": cumulative_us / 1000}
+            for name, self_us, cumulative_us in sorted(rows, key=lambda row: row[1], reverse=True)[:args.top]
+        ],
+    }
+
+    for stage in ("import", "ready"):
+        summary = result[stage]
+        print(
+            f"{stage:<8} median={summary['median_ms']:>8.1f}ms  "
+            f"min={summary['min_ms']:>8.1f}ms  max={summary['max_ms']:>8.1f}ms"
+        )
+    print(f"\n{'self ms':>9} {'cumul ms':>9}  module")
+    for row in result["top_modules"]:
+        print(f"{row['self_ms']:>9.1f} {row['cumulative_ms']:>9.1f}  {row['module']}")
+    return result
+
+
+def parse_args(argv: List[str] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark app import and startup time")
+    parser.add_argument("--module", default="main", help="Module holding the ASGI `app`")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per measurement")
+    parser.add_argument("--top", type=int, default=15, help="Modules to list by import self time")
+    parser.add_argument("--port", type=int, default=9150, help="Port for the readiness measurement")
+    parser.add_argument("--json", dest="json_path", default=None, help="Also write results to this JSON file")
+    return parser.parse_args(argv)
+
+
+def main(argv: List[str] = None) -> None:
+    args = parse_args(argv)
+    result = run(args)
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as file:
+            json.dump(result, file, indent=4)
+
+
+if __name__ == "__main__":
+    main()
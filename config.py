@@ -1,7 +1,146 @@
 import os
-from dotenv import load_dotenv
 
-load_dotenv()
+# An explicit path skips python-dotenv's search up the directory tree (and its import when there is no file)
+DOTENV_PATH = os.getenv("DOTENV_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".env"))
+if os.path.exists(DOTENV_PATH):
+    from dotenv import load_dotenv
 
-# OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-OPENAI_API_KEY=""
+    load_dotenv(DOTENV_PATH)
+
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
+# Point at an OpenAI-compatible server (e.g. benchmarks/mock_openai.py); None uses api.openai.com
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL") or None
+
+# Conversation history log
+HISTORY_PATH = os.getenv("HISTORY_PATH", "kb/conversation_history.jsonl")
+LEGACY_HISTORY_PATH = os.getenv("LEGACY_HISTORY_PATH", "kb/conversation_history.json")
+HISTORY_BATCH_SIZE = int(os.getenv("HISTORY_BATCH_SIZE", "64"))
+HISTORY_FLUSH_INTERVAL = float(os.getenv("HISTORY_FLUSH_INTERVAL", "0.5"))
+HISTORY_QUEUE_SIZE = int(os.getenv("HISTORY_QUEUE_SIZE", "10000"))
+
+# Knowledge base / system prompt cache
+KB_CONTEXT_PATH = os.getenv("KB_CONTEXT_PATH", "kb/base_context.txt")
+CONTEXT_RELOAD_INTERVAL = float(os.getenv("CONTEXT_RELOAD_INTERVAL", "2.0"))
+
+# Scoring backends
+SCORING_HTTP2 = os.getenv("SCORING_HTTP2", "1") == "1"
+
+
+def _scoring_backend(name: str, url: str, timeout: float, deadline: float, max_connections: int) -> dict:
+    prefix = f"SCORING_{name.upper()}"
+    return {
+        "url": os.getenv(f"{prefix}_URL", url),
+        # Per attempt; `deadline` bounds all attempts of one score together
+        "timeout": float(os.getenv(f"{prefix}_TIMEOUT", str(timeout))),
+        "deadline": float(os.getenv(f"{prefix}_DEADLINE", str(deadline))),
+        "connect_timeout": float(os.getenv(f"{prefix}_CONNECT_TIMEOUT", "5.0")),
+        "max_connections": int(os.getenv(f"{prefix}_MAX_CONNECTIONS", str(max_connections))),
+        "max_keepalive_connections": int(os.getenv(f"{prefix}_MAX_KEEPALIVE", str(max_connections))),
+        "keepalive_expiry": float(os.getenv(f"{prefix}_KEEPALIVE_EXPIRY", "60.0")),
+        # Score requests are idempotent, so failed attempts are retried
+        "retries": int(os.getenv(f"{prefix}_RETRIES", "2")),
+        "retry_base_delay": float(os.getenv(f"{prefix}_RETRY_BASE_DELAY", "0.2")),
+        "retry_max_delay": float(os.getenv(f"{prefix}_RETRY_MAX_DELAY", "2.0")),
+        "breaker_failures": int(os.getenv(f"{prefix}_BREAKER_FAILURES", "5")),
+        "breaker_reset": float(os.getenv(f"{prefix}_BREAKER_RESET", "30.0")),
+        # Send a second request once the first outlives this latency percentile; 0 disables hedging
+        "hedge_percentile": float(os.getenv(f"{prefix}_HEDGE_PERCENTILE", "95")),
+        "hedge_min_samples": int(os.getenv(f"{prefix}_HEDGE_MIN_SAMPLES", "20")),
+    }
+
+
+SCORING_BACKENDS = {
+    "micro": _scoring_backend("micro", "https://xsyg6m7fcgbe6vkvjmgy5ibk540besqo.lambda-url.us-east-1.on.aws/", 15.0, 28.0, 50),
+    "nano": _scoring_backend("nano", "http://3.93.68.14:8000/scoring/example", 5.0, 12.0, 50),
+    "agtech": _scoring_backend("agtech", "https://h3un7vgepphw3mosuok4h4jnv40nzdya.lambda-url.us-east-1.on.aws/", 15.0, 28.0, 50),
+}
+
+# Tool dispatch
+TOOL_CONCURRENCY = int(os.getenv("TOOL_CONCURRENCY", "4"))
+TOOL_TIMEOUT = float(os.getenv("TOOL_TIMEOUT", "30.0"))
+
+
+def tool_timeout(name: str) -> float:
+    # Per-tool override, e.g. TOOL_TIMEOUT_MICRO, resolved when the tool registers
+    return float(os.getenv(f"TOOL_TIMEOUT_{name.upper()}", str(TOOL_TIMEOUT)))
+
+
+# Scoring result cache
+SCORE_CACHE_MAX_ENTRIES = int(os.getenv("SCORE_CACHE_MAX_ENTRIES", "1024"))
+SCORE_CACHE_TTLS = {
+    "micro": float(os.getenv("SCORE_CACHE_TTL_MICRO", "300")),
+    "nano": float(os.getenv("SCORE_CACHE_TTL_NANO", "300")),
+    "agtech": float(os.getenv("SCORE_CACHE_TTL_AGTECH", "300")),
+}
+
+# Context window sent to OpenAI
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "6000"))
+CONTEXT_TOOL_OUTPUT_MAX_CHARS = int(os.getenv("CONTEXT_TOOL_OUTPUT_MAX_CHARS", "600"))
+CONTEXT_SUMMARIZE = os.getenv("CONTEXT_SUMMARIZE", "0") == "1"
+CONTEXT_SUMMARY_CACHE_SIZE = int(os.getenv("CONTEXT_SUMMARY_CACHE_SIZE", "256"))
+
+# Knowledge base retrieval
+KB_RETRIEVAL = os.getenv("KB_RETRIEVAL", "1") == "1"
+KB_TOP_K = int(os.getenv("KB_TOP_K", "4"))
+KB_CHUNK_CHARS = int(os.getenv("KB_CHUNK_CHARS", "1200"))
+KB_INDEX_PATH = os.getenv("KB_INDEX_PATH", "kb/kb_index.npz")
+
+# Batch scoring uploads larger than this are rejected with 413
+BATCH_MAX_BYTES = int(os.getenv("BATCH_MAX_BYTES", str(20 * 1024 * 1024)))
+
+# Structured scoring endpoints (one per tool registered with structured=True)
+EXPLANATION_TTL = float(os.getenv("EXPLANATION_TTL", "900"))
+EXPLANATION_MAX_ENTRIES = int(os.getenv("EXPLANATION_MAX_ENTRIES", "1000"))
+
+# Metrics
+METRICS_TIMING_HEADERS = os.getenv("METRICS_TIMING_HEADERS", "0") == "1"
+
+# Tool execution engine
+TOOL_THREAD_WORKERS = int(os.getenv("TOOL_THREAD_WORKERS", "8"))
+TOOL_PROCESS_WORKERS = int(os.getenv("TOOL_PROCESS_WORKERS", "2"))
+# Calls allowed to wait for a busy pool before new ones are rejected
+TOOL_QUEUE_DEPTH = int(os.getenv("TOOL_QUEUE_DEPTH", "32"))
+TOOL_ADMIT_TIMEOUT = float(os.getenv("TOOL_ADMIT_TIMEOUT", "1.0"))
+
+# Opt-in: send only the tools whose keywords match the recent user messages
+TOOL_SELECTION = os.getenv("TOOL_SELECTION", "0") == "1"
+TOOL_SELECTION_TURNS = int(os.getenv("TOOL_SELECTION_TURNS", "3"))
+
+# Answer cache for repeated knowledge-base questions
+ANSWER_CACHE_ENABLED = os.getenv("ANSWER_CACHE_ENABLED", "1") == "1"
+ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "512"))
+ANSWER_CACHE_TTL = float(os.getenv("ANSWER_CACHE_TTL", "3600"))
+ANSWER_CACHE_SEMANTIC = os.getenv("ANSWER_CACHE_SEMANTIC", "0") == "1"
+ANSWER_CACHE_SIMILARITY = float(os.getenv("ANSWER_CACHE_SIMILARITY", "0.9"))
+ANSWER_CACHE_DIM = int(os.getenv("ANSWER_CACHE_DIM", "1024"))
+
+# Worker processes; with more than one, state is shared through SQLite files by default
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "1"))
+SHARED_STATE_BACKEND = os.getenv("SHARED_STATE_BACKEND", "sqlite" if WEB_CONCURRENCY > 1 else "memory")
+SHARED_STATE_PATH = os.getenv("SHARED_STATE_PATH", "kb/shared_state.db")
+SHARED_STATE_MAX_ENTRIES = int(os.getenv("SHARED_STATE_MAX_ENTRIES", "50000"))
+
+# Server-side chat sessions
+SESSION_BACKEND = os.getenv("SESSION_BACKEND", SHARED_STATE_BACKEND)  # "memory" or "sqlite"
+SESSION_SQLITE_PATH = os.getenv("SESSION_SQLITE_PATH", "kb/sessions.db")
+SESSION_MAX_SESSIONS = int(os.getenv("SESSION_MAX_SESSIONS", "10000"))
+SESSION_MAX_MESSAGES = int(os.getenv("SESSION_MAX_MESSAGES", "200"))
+SESSION_TTL = float(os.getenv("SESSION_TTL", "86400"))
+
+# Admission control for the chat endpoints. The caps are for the whole service;
+# each of the WEB_CONCURRENCY workers enforces its share.
+ADMISSION_PATHS = ("/chat", "/chat/stream")
+ADMISSION_MAX_IN_FLIGHT = max(1, int(os.getenv("ADMISSION_MAX_IN_FLIGHT", "64")) // WEB_CONCURRENCY)
+# Requests allowed to wait for a slot; beyond this they are rejected at once
+ADMISSION_MAX_QUEUE = max(1, int(os.getenv("ADMISSION_MAX_QUEUE", "128")) // WEB_CONCURRENCY)
+ADMISSION_QUEUE_TIMEOUT = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "5.0"))
+# Token bucket per client (API key, else IP address); 0 disables rate limiting.
+# Buckets live in the shared state with the sqlite backend; with in-memory
+# state each worker gets 1/WEB_CONCURRENCY of the rate and burst.
+RATE_LIMIT_PER_MINUTE = float(os.getenv("RATE_LIMIT_PER_MINUTE", "30"))
+RATE_LIMIT_BURST = int(os.getenv("RATE_LIMIT_BURST", "10"))
+RATE_LIMIT_MAX_CLIENTS = int(os.getenv("RATE_LIMIT_MAX_CLIENTS", "10000"))
+# Comma-separated API keys that get their own bucket; any other key is limited by IP
+RATE_LIMIT_API_KEYS = frozenset(key.strip() for key in os.getenv("RATE_LIMIT_API_KEYS", "").split(",") if key.strip())
+# Only behind a proxy that sets X-Forwarded-For
+RATE_LIMIT_TRUST_FORWARDED = os.getenv("RATE_LIMIT_TRUST_FORWARDED", "0") == "1"
@@ -0,0 +1,196 @@
+# context_cache.py
+import hashlib
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from tools import get_tools, select_tools
+from tool_registry import tool_registry
+from config import (
+    KB_CONTEXT_PATH,
+    CONTEXT_RELOAD_INTERVAL,
+    KB_RETRIEVAL,
+    KB_TOP_K,
+    TOOL_SELECTION,
+    TOOL_SELECTION_TURNS,
+)
+from retrieval import KnowledgeIndex, load_or_build_index
+
+logger = logging.getLogger(__name__)
+
+SYSTEM_PROMPT_TEMPLATE = """You are an assistant with access to tools.
+        When asked to be scored for micro loan product,
+        use the 'micro' tool with the provided {micro_fields}.
+        When asked for a credit score of nano product or nano scoring, 
+        use the 'nano' tool with the provided {nano_fields}. 
+        When asked for a credit score of agtech product or agtech scoring or if 
+        someone expresses itsefl as a farmer and want to be scored, use the 'agtech' 
+        tool with the provided {agtech_fields}. 
+        Always be mindful of the data provided to tools and  the score returned. When asked to 
+        explain credit score, please correlate the data with the score responded and give a valid
+        explanation as if you have the scoring. Whenever you get 
+        asked about other stuff, answer it if you can relate it to Kifiya Financial 
+        Technology.When asked about Inventory finance, invoice finance, device and 
+        asset finance, buy now pay later, or similar product, answer it correlating 
+        with Kifiya Financial technology saying this is what we are doing. You have to answer a very precise and to the
+         point answers. You can not take more than two to three sentences to explain things! 
+        This is a general Kifiya level tech Infrastructure and platform knowladge base: {context}"""
+
+
+def load_context(path: str = KB_CONTEXT_PATH) -> str:
+    try:
+        with open(path, 'r', encoding='utf-8') as file:
+            context = file.read()
+    except FileNotFoundError:
+        context = ""
+    return context
+
+
+def latest_user_message(messages: List[Dict[str, Any]]) -> Optional[str]:
+    for message in reversed(messages):
+        if message.get("role") == "user" and isinstance(message.get("content"), str):
+            return message["content"]
+    return None
+
+
+def recent_user_text(messages: List[Dict[str, Any]], turns: int = TOOL_SELECTION_TURNS) -> str:
+    """
+    The last few user messages joined, so follow-ups like "I am 30, male"
+    still select the tool asked for a turn earlier.
+    """
+    texts: List[str] = []
+    for message in reversed(messages):
+        if len(texts) >= turns:
+            break
+        if message.get("role") == "user" and isinstance(message.get("content"), str):
+            texts.append(message["content"])
+    return "\n".join(reversed(texts))
+
+
+def tool_fields() -> Dict[str, str]:
+    # Field lists in the prompt come from the registered signatures so they cannot drift
+    return {
+        f"{name}_fields": ", ".join(tool_registry[name].param_names)
+        for name in ("micro", "nano", "agtech")
+    }
+
+
+class PromptCache:
+    """
+    Holds the prebuilt system message and tool schemas.
+    The knowledge base is re-read only when its mtime changes, and the mtime
+    itself is checked at most once per reload interval, so the per-request
+    path normally does no file I/O and no prompt formatting.
+    With retrieval enabled, only the knowledge base chunks relevant to the
+    latest user message are put into the system prompt.
+    """
+
+    def __init__(
+        self,
+        path: str = KB_CONTEXT_PATH,
+        reload_interval: float = CONTEXT_RELOAD_INTERVAL,
+        retrieval: bool = KB_RETRIEVAL,
+        top_k: int = KB_TOP_K,
+    ):
+        self.path = path
+        self.reload_interval = reload_interval
+        self.retrieval = retrieval
+        self.top_k = top_k
+        self._index: Optional[KnowledgeIndex] = None
+        self._lock = threading.Lock()
+        self._mtime: Optional[float] = None
+        self._checked_at = 0.0
+        self._context = ""
+        self._prompt_prefix = ""
+        self._system_content = ""
+        self._version_hash = ""
+        self._tools: Tuple[Dict[str, Any], ...] = ()
+        self._loaded = False
+
+    def load(self) -> None:
+        with self._lock:
+            self._load()
+
+    def _load(self) -> None:
+        mtime = self._stat()
+        context = load_context(self.path)
+        self._context = context
+        self._prompt_prefix = SYSTEM_PROMPT_TEMPLATE.format(context="", **tool_fields())
+        self._system_content = self._prompt_prefix + context
+        self._version_hash = hashlib.sha256(self._system_content.encode("utf-8")).hexdigest()[:16]
+        self._index = load_or_build_index(context) if self.retrieval else None
+        self._tools = tuple(get_tools())
+        self._mtime = mtime
+        self._checked_at = time.monotonic()
+        self._loaded = True
+        logger.info(f"Loaded knowledge base from {self.path} ({len(context)} chars)")
+
+    def _stat(self) -> Optional[float]:
+        try:
+            return os.stat(self.path).st_mtime
+        except FileNotFoundError:
+            return None
+
+    def _refresh(self) -> None:
+        if not self._loaded:
+            self.load()
+            return
+        now = time.monotonic()
+        if now - self._checked_at < self.reload_interval:
+            return
+        with self._lock:
+            if now - self._checked_at < self.reload_interval:
+                return
+            self._checked_at = now
+            if self._stat() != self._mtime:
+                self._load()
+
+    @property
+    def context(self) -> str:
+        self._refresh()
+        return self._context
+
+    @property
+    def version(self) -> Optional[float]:
+        self._refresh()
+        return self._mtime
+
+    @property
+    def version_hash(self) -> str:
+        """
+        Changes whenever the system prompt or knowledge base does; keys cached answers.
+        """
+        self._refresh()
+        return self._version_hash
+
+    def system_message(self, query: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Returns a fresh system message dict. Without a query, with retrieval
+        disabled, or when no chunk matches the query, the full, shared knowledge
+        base prompt is used.
+        """
+        self._refresh()
+        index = self._index
+        excerpt = index.context_for(query, self.top_k) if index is not None and query else None
+        if excerpt is None:
+            return {"role": "system", "content": self._system_content}
+        return {"role": "system", "content": self._prompt_prefix + excerpt}
+
+    def tools(self, text: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Returns the prebuilt tool schemas; given the recent user text and with tool
+        selection enabled, only the relevant ones. When no keyword matches, all tools
+        are sent, since keywords cannot anticipate every phrasing. The schema dicts
+        are shared and must not be mutated.
+        """
+        self._refresh()
+        if TOOL_SELECTION and text is not None:
+            selected = select_tools(text)
+            if selected:
+                return selected
+        return list(self._tools)
+
+
+prompt_cache = PromptCache()
@@ -0,0 +1,170 @@
+# context_window.py
+import hashlib
+import json
+import logging
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+from config import (
+    CONTEXT_TOKEN_BUDGET,
+    CONTEXT_TOOL_OUTPUT_MAX_CHARS,
+    CONTEXT_SUMMARIZE,
+    CONTEXT_SUMMARY_CACHE_SIZE,
+)
+
+logger = logging.getLogger(__name__)
+
+# Per-message framing tokens in the chat format
+MESSAGE_OVERHEAD_TOKENS = 4
+
+SUMMARY_PROMPT = (
+    "Summarize the following earlier part of a conversation between a user and the "
+    "Kifiya assistant in at most five sentences. Keep any applicant data and credit "
+    "scores that were mentioned."
+)
+
+
+@lru_cache(maxsize=1)
+def _encoding() -> Any:
+    # Without tiktoken or its encoding file (fetched on first use) token counts are estimated from length
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        return tiktoken.encoding_for_model("gpt-4")
+    except Exception:
+        return None
+
+
+def count_text_tokens(text: str) -> int:
+    if not text:
+        return 0
+    encoding = _encoding()
+    if encoding is None:
+        return len(text) // 4 + 1
+    return len(encoding.encode(text))
+
+
+def count_message_tokens(message: Dict[str, Any]) -> int:
+    tokens = MESSAGE_OVERHEAD_TOKENS + count_text_tokens(message.get("content") or "")
+    for tool_call in message.get("tool_calls") or []:
+        function = tool_call.get("function") or {}
+        tokens += count_text_tokens(function.get("name") or "")
+        tokens += count_text_tokens(function.get("arguments") or "")
+    return tokens
+
+
+def _group_turns(messages: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+    # A turn runs from one user message to the next, so tool results always
+    # stay with the assistant message that requested them
+    groups: List[List[Dict[str, Any]]] = []
+    for message in messages:
+        if message.get("role") == "user" or not groups:
+            groups.append([message])
+        else:
+            groups[-1].append(message)
+    return groups
+
+
+def _compress_tool_output(message: Dict[str, Any], max_chars: int) -> Dict[str, Any]:
+    content = message.get("content") or ""
+    if message.get("role") != "tool" or len(content) <= max_chars:
+        return message
+    return {**message, "content": content[:max_chars] + " ...[truncated]"}
+
+
+class ContextWindow:
+    """
+    Fits a conversation into a token budget before it is sent to OpenAI.
+    Leading system messages and the latest turn are always kept; tool outputs
+    of older turns are truncated, then the oldest turns are dropped and,
+    if enabled, replaced by a cached LLM summary.
+    """
+
+    def __init__(
+        self,
+        budget: int = CONTEXT_TOKEN_BUDGET,
+        tool_output_max_chars: int = CONTEXT_TOOL_OUTPUT_MAX_CHARS,
+        summarize: bool = CONTEXT_SUMMARIZE,
+        summary_cache_size: int = CONTEXT_SUMMARY_CACHE_SIZE,
+    ):
+        self.budget = budget
+        self.tool_output_max_chars = tool_output_max_chars
+        self.summarize = summarize
+        self.summary_cache_size = summary_cache_size
+        self._summaries: "OrderedDict[str, str]" = OrderedDict()
+
+    async def fit(self, messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Returns a new message list within the budget; the input list is not modified.
+        """
+        split = 0
+        while split < len(messages) and messages[split].get("role") == "system":
+            split += 1
+        system, rest = messages[:split], messages[split:]
+        if not rest:
+            return list(messages)
+
+        groups = _group_turns(rest)
+        latest = groups[-1]
+        older = [
+            [_compress_tool_output(message, self.tool_output_max_chars) for message in group]
+            for group in groups[:-1]
+        ]
+
+        used = sum(count_message_tokens(message) for message in system + latest)
+        group_tokens = [sum(count_message_tokens(message) for message in group) for group in older]
+        if used + sum(group_tokens) <= self.budget:
+            return system + [message for group in older for message in group] + latest
+
+        # Keep the newest older turns that fit; everything before them is dropped
+        kept_from = len(older)
+        remaining = self.budget - used
+        while kept_from > 0 and group_tokens[kept_from - 1] <= remaining:
+            remaining -= group_tokens[kept_from - 1]
+            kept_from -= 1
+        dropped = [message for group in older[:kept_from] for message in group]
+        kept = [message for group in older[kept_from:] for message in group]
+        logger.debug(f"Context window dropped {len(dropped)} messages to fit {self.budget} tokens")
+
+        summary = await self._summary(dropped) if self.summarize and dropped else None
+        if summary:
+            system = system + [{"role": "system", "content": f"Summary of the earlier conversation: {summary}"}]
+        return system + kept + latest
+
+    async def _summary(self, dropped: List[Dict[str, Any]]) -> Optional[str]:
+        key = hashlib.sha256(
+            json.dumps(dropped, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8")
+        ).hexdigest()
+        cached = self._summaries.get(key)
+        if cached is not None:
+            self._summaries.move_to_end(key)
+            return cached
+
+        # Imported here to keep this module free of the OpenAI client at import time
+        from utils import call_openai_chat
+
+        transcript = "\n".join(
+            f"{message.get('role')}: {message.get('content') or ''}"
+            for message in dropped
+            if message.get("content")
+        )
+        try:
+            response = await call_openai_chat([
+                {"role": "system", "content": SUMMARY_PROMPT},
+                {"role": "user", "content": transcript},
+            ])
+            summary = response.choices[0].message.content
+        except Exception as e:
+            logger.error(f"Conversation summary failed: {e}")
+            return None
+
+        self._summaries[key] = summary
+        while len(self._summaries) > self.summary_cache_size:
+            self._summaries.popitem(last=False)
+        return summary
+
+
+context_window = ContextWindow()
@@ -2,43 +2,73 @@
 import httpx
 import logging
 import webbrowser
+from typing import Annotated
+
+from pydantic import Field
+
+from scoring_clients import scoring_clients
+from tool_registry import tool
 
 logger = logging.getLogger(__name__)
 
-def add(a: int, b: int) -> int:
+@tool(
+    description="Add two numbers",
+    keywords=("add", "sum", "plus", "total"),
+)
+def add(
+    a: Annotated[int, Field(description="First number")],
+    b: Annotated[int, Field(description="Second number")]
+) -> int:
     print("function called")
     return a + b
 
-def greet(name: str) -> str:
+@tool(
+    description="Greet a person by name",
+    keywords=("hello", "hi", "hey", "greet", "name"),
+)
+def greet(
+    name: Annotated[str, Field(description="Person's name")]
+) -> str:
     print("function called")
     return f"Hello mate, {name}! How can I assist you today?"
 
-def weather(city: str) -> str:
+@tool(
+    description="Get weather information for a city",
+    keywords=("weather", "temperature", "rain", "sunny", "forecast"),
+)
+def weather(
+    city: Annotated[str, Field(description="City name")]
+) -> str:
     print("function called")
     return f"The weather in {city} is sunny with a high of 25°C."
 
+@tool(
+    description="Calculate a micro credit score for an individual or business based on product type and detailed business information. Use this when asked for micro credit scores or financial eligibility.",
+    keywords=("micro", "score", "scored", "scoring", "credit", "loan", "eligibility", "eligible", "business"),
+    structured=True,
+)
 async def micro(
-    product_type: str,
-    business_region: str,
-    business_subcity: str,
-    business_woreda: str,
-    business_level: str,
-    business_number_of_employees: int,
-    business_source_of_initial_capital: str,
-    business_sector: str,
-    business_annual_income: float,
-    business_association_type: str,
-    business_starting_capital: float,
-    business_current_capital: float,
-    business_annual_profit: float,
-    business_establishment_year: str,
-    business_monthly_income: float,
-    business_description: str,
-    customer_age: int,
-    customer_level_of_education: str,
-    customer_gender: str,
-    customer_marital_status: str,
-    customer_document_type: str
+    product_type: Annotated[str, Field(description="Type of product (e.g., safee_micro)")],
+    business_region: Annotated[str, Field(description="Business region (e.g., addis_ababa)")],
+    business_subcity: Annotated[str, Field(description="Business subcity (e.g., Bole)")],
+    business_woreda: Annotated[str, Field(description="Business woreda (e.g., 07)")],
+    business_level: Annotated[str, Field(description="Business level (e.g., startup)")],
+    business_number_of_employees: Annotated[int, Field(description="Number of employees (e.g., 3)")],
+    business_source_of_initial_capital: Annotated[str, Field(description="Source of initial capital (e.g., own)")],
+    business_sector: Annotated[str, Field(description="Business sector (e.g., building_and_construction)")],
+    business_annual_income: Annotated[float, Field(description="Annual income of the business (e.g., 500000)")],
+    business_association_type: Annotated[str, Field(description="Association type (e.g., own)")],
+    business_starting_capital: Annotated[float, Field(description="Starting capital of the business (e.g., 100000)")],
+    business_current_capital: Annotated[float, Field(description="Current capital of the business (e.g., 200000)")],
+    business_annual_profit: Annotated[float, Field(description="Annual profit of the business (e.g., 150000)")],
+    business_establishment_year: Annotated[str, Field(description="Year of establishment (e.g., 2015)")],
+    business_monthly_income: Annotated[float, Field(description="Monthly income of the business (e.g., 4000)")],
+    business_description: Annotated[str, Field(description="Description of the business (e.g., small shop)")],
+    customer_age: Annotated[int, Field(description="Age of the customer (e.g., 25)")],
+    customer_level_of_education: Annotated[str, Field(description="Level of education (e.g., bachelors)")],
+    customer_gender: Annotated[str, Field(description="Gender of the customer (e.g., f)")],
+    customer_marital_status: Annotated[str, Field(description="Marital status of the customer (e.g., married)")],
+    customer_document_type: Annotated[str, Field(description="Type of customer document (e.g., PASSPORT)")]
 ) -> dict:
     payload = {
         "product_type": product_type,
@@ -67,24 +97,30 @@ async def micro(
     }
 
     print("function called")
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.post(
-                "https://xsyg6m7fcgbe6vkvjmgy5ibk540besqo.lambda-url.us-east-1.on.aws/",
-                json=payload
-            )
-            response.raise_for_status()
-            data = response.json()
-        except httpx.HTTPStatusError as e:
-            logger.error(f"Scoring API error: {e.response.status_code} - {e.response.text}")
-            raise  # Re-raise to let handle_function_call catch it
+    try:
+        response = await scoring_clients.post("micro", json=payload)
+        response.raise_for_status()
+        data = response.json()
+    except httpx.HTTPStatusError as e:
+        logger.error(f"Scoring API error: {e.response.status_code} - {e.response.text}")
+        raise  # Re-raise to let handle_function_call catch it
 
     return {
         "message": "Here is the credit score data for micro",
         "data": data
     }
 
-async def nano(gender: str, age: int, business_sector: str, region: str) -> dict:
+@tool(
+    description="Calculate a nano credit score for an individual based on gender, age, business sector, and region. Use this when asked for credit scores or financial eligibility.",
+    keywords=("nano", "score", "scored", "scoring", "credit", "loan", "eligibility", "eligible"),
+    structured=True,
+)
+async def nano(
+    gender: Annotated[str, Field(description="Gender of the individual (e.g., male, female)")],
+    age: Annotated[int, Field(description="Age of the individual")],
+    business_sector: Annotated[str, Field(description="Business sector (e.g., tech, finance)")],
+    region: Annotated[str, Field(description="Region or state (e.g., California)")]
+) -> dict:
     payload = {
         "gender": gender,
         "age": age,
@@ -93,27 +129,31 @@ async def nano(gender: str, age: int, business_sector: str, region: str) -> dict
     }
 
     print("function called")
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.post("http://3.93.68.14:8000/scoring/example", json=payload)
-            response.raise_for_status()
-            data = response.json()
-        except httpx.HTTPStatusError as e:
-            logger.error(f"Scoring API error: {e.response.status_code} - {e.response.text}")
-            raise  # Re-raise to let handle_function_call catch it
+    try:
+        response = await scoring_clients.post("nano", json=payload)
+        response.raise_for_status()
+        data = response.json()
+    except httpx.HTTPStatusError as e:
+        logger.error(f"Scoring API error: {e.response.status_code} - {e.response.text}")
+        raise  # Re-raise to let handle_function_call catch it
 
     return {
         "message": "Here is the credit score data for nano product",
         "data": data
     }
 
+@tool(
+    description="Calculate an agtech credit score for a farmer or agricultural entity based on region, latitude, longitude, land area, crop type, and yield estimation year. Use this when asked for agtech credit scores or financial eligibility for farmers.",
+    keywords=("agtech", "farmer", "farmers", "farm", "farming", "crop", "crops", "agriculture", "agri", "score", "scored", "scoring", "credit"),
+    structured=True,
+)
 async def agtech(
-    region: str,
-    latitude: float,
-    longitude: float,
-    land_area: int,
-    crop_type: str,
-    yield_estimation_year: int
+    region: Annotated[str, Field(description="Region or location (e.g., Afar)")],
+    latitude: Annotated[float, Field(description="Latitude of the land (e.g., 8.6)")],
+    longitude: Annotated[float, Field(description="Longitude of the land (e.g., 36.5)")],
+    land_area: Annotated[int, Field(description="Land area in hectares (e.g., 2)")],
+    crop_type: Annotated[str, Field(description="Type of crop (e.g., potato)")],
+    yield_estimation_year: Annotated[int, Field(description="Year for yield estimation (e.g., 2025)")]
 ) -> dict:
     payload = {
         "agriFinance": {
@@ -127,17 +167,13 @@ async def agtech(
     }
 
     print("function called")
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.post(
-                "https://h3un7vgepphw3mosuok4h4jnv40nzdya.lambda-url.us-east-1.on.aws/",
-                json=payload
-            )
-            response.raise_for_status()
-            data = response.json()
-        except httpx.HTTPStatusError as e:
-            logger.error(f"Scoring API error: {e.response.status_code} - {e.response.text}")
-            raise  # Re-raise to let handle_function_call catch it
+    try:
+        response = await scoring_clients.post("agtech", json=payload)
+        response.raise_for_status()
+        data = response.json()
+    except httpx.HTTPStatusError as e:
+        logger.error(f"Scoring API error: {e.response.status_code} - {e.response.text}")
+        raise  # Re-raise to let handle_function_call catch it
 
     return {
         "message": "Here is the credit score data for AgTech product",
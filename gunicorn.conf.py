@@ -0,0 +1,24 @@
+# gunicorn.conf.py
+# Multi-process serving: gunicorn -c gunicorn.conf.py main:app
+import multiprocessing
+import os
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", str(multiprocessing.cpu_count())))
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# Not preloaded: every worker imports the app and runs its own lifespan,
+# so HTTP clients, pools and SQLite connections are never shared across a fork
+preload_app = False
+
+# Long enough for a chat turn with two LLM rounds and a scoring call
+timeout = int(os.getenv("WORKER_TIMEOUT", "120"))
+graceful_timeout = int(os.getenv("GRACEFUL_TIMEOUT", "30"))
+keepalive = int(os.getenv("KEEPALIVE", "5"))
+
+accesslog = "-"
+errorlog = "-"
+loglevel = os.getenv("LOG_LEVEL", "info")
+
+# Workers read this to pick the SQLite shared-state backend by default
+os.environ["WEB_CONCURRENCY"] = str(workers)
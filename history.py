@@ -0,0 +1,207 @@
+# history.py
+import asyncio
+import json
+import logging
+import os
+from typing import Any, Dict, Iterator, List, Optional
+
+from config import (
+    HISTORY_PATH,
+    LEGACY_HISTORY_PATH,
+    HISTORY_BATCH_SIZE,
+    HISTORY_FLUSH_INTERVAL,
+    HISTORY_QUEUE_SIZE,
+)
+from shared_state import file_lock
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+def iter_history(path: str = HISTORY_PATH) -> Iterator[Dict[str, Any]]:
+    """
+    Streams conversation entries from the JSONL log, one line at a time.
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as file:
+            for line in file:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    # A torn final line from a crash; skip it
+                    logger.warning(f"Skipping malformed history line in {path}")
+    except FileNotFoundError:
+        return
+
+
+def iter_legacy_history(path: str = LEGACY_HISTORY_PATH, chunk_size: int = 65536) -> Iterator[Dict[str, Any]]:
+    """
+    Streams entries from the legacy JSON array file without loading it whole.
+    """
+    decoder = json.JSONDecoder()
+    try:
+        file = open(path, 'r', encoding='utf-8')
+    except FileNotFoundError:
+        return
+
+    with file:
+        buffer = ""
+        started = False
+        eof = False
+        while True:
+            buffer = buffer.lstrip()
+            if not started:
+                if not buffer and not eof:
+                    chunk = file.read(chunk_size)
+                    eof = not chunk
+                    buffer += chunk
+                    continue
+                if not buffer.startswith('['):
+                    return
+                buffer = buffer[1:]
+                started = True
+                continue
+
+            if buffer.startswith(','):
+                buffer = buffer[1:]
+                continue
+            if buffer.startswith(']'):
+                return
+
+            try:
+                entry, end = decoder.raw_decode(buffer)
+            except json.JSONDecodeError:
+                if eof:
+                    logger.warning(f"Legacy history file {path} is truncated")
+                    return
+                chunk = file.read(chunk_size)
+                eof = not chunk
+                buffer += chunk
+                continue
+
+            yield entry
+            buffer = buffer[end:]
+
+
+def migrate_legacy_history(legacy_path: str = LEGACY_HISTORY_PATH, path: str = HISTORY_PATH) -> int:
+    """
+    One-time conversion of the legacy JSON array file into the JSONL log.
+    Does nothing once the JSONL log exists. Returns the number of migrated entries.
+    """
+    if os.path.exists(path) or not os.path.exists(legacy_path):
+        return 0
+
+    # Every worker runs this at startup; only the first one migrates
+    with file_lock(f"{path}.lock"):
+        if os.path.exists(path):
+            return 0
+        return _migrate(legacy_path, path)
+
+
+def _migrate(legacy_path: str, path: str) -> int:
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    count = 0
+    with open(tmp_path, 'w', encoding='utf-8') as file:
+        for entry in iter_legacy_history(legacy_path):
+            file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            count += 1
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(tmp_path, path)
+    logger.info(f"Migrated {count} conversations from {legacy_path} to {path}")
+    return count
+
+
+class ConversationLog:
+    """
+    Append-only JSONL conversation log fed by a background writer task.
+    Requests only enqueue; the writer batches entries and fsyncs once per batch.
+    Batches are appended under a file lock, so several worker processes can
+    share one log without interleaving lines.
+    """
+
+    def __init__(
+        self,
+        path: str = HISTORY_PATH,
+        legacy_path: str = LEGACY_HISTORY_PATH,
+        batch_size: int = HISTORY_BATCH_SIZE,
+        flush_interval: float = HISTORY_FLUSH_INTERVAL,
+        max_queue: int = HISTORY_QUEUE_SIZE,
+    ):
+        self.path = path
+        self.legacy_path = legacy_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        if self._task is not None:
+            return
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        await asyncio.to_thread(migrate_legacy_history, self.legacy_path, self.path)
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        await self._queue.put(_STOP)
+        await self._task
+        self._task = None
+        self._queue = None
+
+    async def log(self, messages: List[Dict[str, Any]], response: str) -> None:
+        entry = {
+            "messages": messages,
+            "response": response
+        }
+        if self._queue is None:
+            # Writer not running (e.g. used outside the app lifespan)
+            await asyncio.to_thread(self._write_batch, [entry])
+            return
+        # Only waits when the queue is full, which applies backpressure
+        await self._queue.put(entry)
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            entry = await self._queue.get()
+            if entry is _STOP:
+                break
+            batch = [entry]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    entry = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if entry is _STOP:
+                    stopping = True
+                    break
+                batch.append(entry)
+
+            try:
+                await asyncio.to_thread(self._write_batch, batch)
+            except Exception as e:
+                logger.error(f"Failed to write {len(batch)} conversations to {self.path}: {e}")
+
+    def _write_batch(self, batch: List[Dict[str, Any]]) -> None:
+        data = "".join(json.dumps(entry, ensure_ascii=False) + "\n" for entry in batch)
+        with file_lock(f"{self.path}.lock"), open(self.path, 'a', encoding='utf-8') as file:
+            file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+
+
+conversation_log = ConversationLog()
@@ -1,26 +1,77 @@
 # main.py
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 import logging
 import os
-import json
-from tools import get_tools
-from utils import call_openai_chat, handle_function_call
-from routers import scoring, kyc
+from contextlib import asynccontextmanager
+from utils import call_openai_chat, handle_function_calls, get_openai_client
+from history import conversation_log
+from context_cache import prompt_cache, latest_user_message, recent_user_text
+from scoring_clients import scoring_clients
+from tool_executor import tool_executor
+from streaming import stream_chat, cached_stream
+from answer_cache import answer_cache, cacheable_question
+from sessions import session_store, new_session_id
+from shared_state import shared_cache
+from context_window import context_window, count_text_tokens
+from metrics import registry, timed, chat_stage_seconds, MetricsMiddleware
+from admission import AdmissionMiddleware, rate_limiter
+from routers import scoring, kyc, structured
 from fastapi.middleware.cors import CORSMiddleware  # Import CORS middleware
 
 
 
-from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
+from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse, PlainTextResponse, Response
+from functools import lru_cache
 from pathlib import Path
 from starlette.requests import Request
+import asyncio
+import hashlib
 # Set up logging
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Runs once in every worker process; clients, pools and caches are per worker
+    prompt_cache.load()
+    await scoring_clients.start()
+    tool_executor.start()
+    await conversation_log.start()
+    home_page()
+    # Import openai and load the tokenizer off the event loop while the worker already accepts requests
+    warmup = asyncio.create_task(asyncio.to_thread(_warm_up))
+    # Only logged; the first chat request retries creating the client
+    warmup.add_done_callback(_log_warmup_failure)
+    logger.info(f"Worker {os.getpid()} ready")
+    yield
+    # Drain pending history entries before exiting
+    await conversation_log.stop()
+    await scoring_clients.close()
+    tool_executor.shutdown()
+    await session_store.close()
+    if shared_cache is not None:
+        await shared_cache.close()
+    if rate_limiter is not None:
+        rate_limiter.close()
+    await asyncio.gather(warmup, return_exceptions=True)
+
+
+def _warm_up() -> None:
+    get_openai_client()
+    count_text_tokens("warm-up")
+
+
+def _log_warmup_failure(task: "asyncio.Task") -> None:
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning(f"Warm-up failed: {task.exception()}")
+
+
+app = FastAPI(lifespan=lifespan)
+# Innermost, so 429s still get CORS headers and are counted by the metrics middleware
+app.add_middleware(AdmissionMiddleware)
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -28,99 +79,136 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],  # Allows all methods (GET, POST, etc.)
     allow_headers=["*"],  # Allows all headers
+    expose_headers=["Server-Timing", "X-Session-Id", "Retry-After"],
 )
+app.add_middleware(MetricsMiddleware)
 
-templates = Jinja2Templates(directory=str(Path(__file__).parent / "front_end"))
+HOME_PAGE_PATH = Path(__file__).parent / "front_end" / "home.html"
 
 
 app.include_router(scoring.router, prefix="/scoring", tags=["Scoring"])
 app.include_router(kyc.router, prefix="/kyc", tags=["KYC"])
+app.include_router(structured.router, prefix="/structured", tags=["Structured Scoring"])
+
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def serve_metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+@lru_cache(maxsize=1)
+def home_page() -> Tuple[bytes, str]:
+    # The page has no template variables, so it is read once and served as-is
+    body = HOME_PAGE_PATH.read_bytes()
+    return body, '"' + hashlib.sha256(body).hexdigest()[:16] + '"'
 
 @app.get("/home", response_class=HTMLResponse)
 async def serve_home_page(request: Request):
-    return templates.TemplateResponse("home.html", {"request": request})
-
-def log_conversation_history(messages: List[Dict[str, Any]], response: str):
-    history_path = 'kb/conversation_history.json'
-    conversation = {
-        "messages": messages,
-        "response": response
-    }
-
-    # Create file if it doesn't exist
-    if not os.path.exists('kb'):
-        os.makedirs('kb')
-
-    # Load existing history
-    try:
-        with open(history_path, 'r', encoding='utf-8') as file:
-            history_data = json.load(file)
-    except (FileNotFoundError, json.JSONDecodeError):
-        history_data = []
-
-    # Append current conversation
-    history_data.append(conversation)
-
-    # Save back to file
-    with open(history_path, 'w', encoding='utf-8') as file:
-        json.dump(history_data, file, indent=4, ensure_ascii=False)
-
-def load_context():
-    try:
-        with open('kb/base_context.txt', 'r', encoding='utf-8') as file:
-            context = file.read()
-    except FileNotFoundError:
-        context = ""
-    return context
-    
+    body, etag = home_page()
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    return HTMLResponse(body, headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+async def log_conversation_history(messages: List[Dict[str, Any]], response: str):
+    # Enqueue only; the background writer appends to the JSONL log
+    await conversation_log.log(messages, response)
 
 class ChatRequest(BaseModel):
-    messages: List[Dict[str, Any]]  # [{"role": "user", "content": "..."}]
+    # Either the full conversation (stateless clients) ...
+    messages: Optional[List[Dict[str, Any]]] = None  # [{"role": "user", "content": "..."}]
+    # ... or just the new user message, with the rest kept server-side
+    message: Optional[str] = None
+    session_id: Optional[str] = None
+
+class Turn:
+    """
+    One chat turn: the conversation sent to the model and, for session
+    requests, where the messages new in this turn start.
+    """
+
+    def __init__(self, history: List[Dict[str, Any]], session_id: Optional[str] = None):
+        self.session_id = session_id
+        self.messages = history
+        self.start = len(history) - 1 if session_id is not None else 0
+
+    def headers(self) -> Dict[str, str]:
+        return {"X-Session-Id": self.session_id} if self.session_id is not None else {}
+
+    async def finish(self, conversation: List[Dict[str, Any]], response_text: str):
+        if self.session_id is not None:
+            # The system message is rebuilt per turn, so it is never stored
+            offset = 1 if conversation and conversation[0].get("role") == "system" else 0
+            new_messages = conversation[self.start + offset:]
+            new_messages.append({"role": "assistant", "content": response_text})
+            await session_store.append(self.session_id, new_messages)
+        await log_conversation_history(conversation, response_text)
+
+async def start_turn(req: ChatRequest) -> Turn:
+    if req.message is None:
+        if req.messages is None:
+            raise HTTPException(status_code=422, detail="Send either `messages` or `message`.")
+        return Turn(list(req.messages))
+
+    history = await session_store.get(req.session_id) if req.session_id else None
+    # Unknown or expired ids start a new session rather than trusting the client's id
+    session_id = req.session_id if history is not None else new_session_id()
+    history = history or []
+    history.append({"role": "user", "content": req.message})
+    return Turn(history, session_id)
+
+def with_system_message(messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    # A new list, so the stored history never holds the per-turn system prompt
+    return [prompt_cache.system_message(latest_user_message(messages))] + messages
+
+async def cached_answer(question: Optional[str]) -> Optional[str]:
+    if answer_cache is None or question is None:
+        return None
+    return await answer_cache.fetch(question, prompt_cache.version_hash)
+
+async def cache_answer(question: Optional[str], messages: List[Dict[str, Any]], response_text: str):
+    # Only answers produced without tools are independent of live scoring data
+    if answer_cache is None or question is None:
+        return
+    if any(message.get("role") == "tool" for message in messages):
+        return
+    await answer_cache.store(question, prompt_cache.version_hash, response_text)
+
+def chat_response(turn: Turn, response_text: str) -> JSONResponse:
+    body = {"response": response_text}
+    if turn.session_id is not None:
+        body["session_id"] = turn.session_id
+    return JSONResponse(body, headers=turn.headers())
 
 @app.post("/chat")
 async def chat_with_agent(req: ChatRequest):
-    messages = req.messages
-    # Add a system message to guide the LLM
-    messages.insert(0, {"role": "system",
-        "content": f"""You are an assistant with access to tools.
-        When asked to be scored for micro loan product,
-        use the 'micro' tool with the provided product_type, business_region,
-        business_subcity, business_woreda, 
-        business_level, business_number_of_employees, business_source_of_initial_capital,
-        business_sector, business_annual_income, business_association_type, 
-        business_starting_capital, business_current_capital, business_annual_profit, 
-        business_establishment_year, business_monthly_income, business_description, 
-        customer_age, customer_level_of_education, customer_gender, customer_marital_status, 
-        customer_document_type. When asked for a credit score of nano product or nano scoring, 
-        use the 'nano' tool with the provided gender, age, business sector, and region. 
-        When asked for a credit score of agtech product or agtech scoring or if 
-        someone expresses itsefl as a farmer and want to be scored, use the 'agtech' 
-        tool with the provided gender, age, business sector, and region. 
-        Always be mindful of the data provided to tools and  the score returned. When asked to 
-        explain credit score, please correlate the data with the score responded and give a valid
-        explanation as if you have the scoring. Whenever you get 
-        asked about other stuff, answer it if you can relate it to Kifiya Financial 
-        Technology.When asked about Inventory finance, invoice finance, device and 
-        asset finance, buy now pay later, or similar product, answer it correlating 
-        with Kifiya Financial technology saying this is what we are doing. You have to answer a very precise and to the
-         point answers. You can not take more than two to three sentences to explain things! 
-        This is a general Kifiya level tech Infrastructure and platform knowladge base: {load_context()}"""})
-    tools = get_tools()
+    turn = await start_turn(req)
+    question = cacheable_question(turn.messages)
+    cached = await cached_answer(question)
+    if cached is not None:
+        await turn.finish(turn.messages, cached)
+        return chat_response(turn, cached)
+
+    with timed(chat_stage_seconds, "prompt", stage="prompt"):
+        # Add a system message to guide the LLM
+        messages = with_system_message(turn.messages)
+        # Only the tools relevant to the conversation are sent
+        tools = prompt_cache.tools(recent_user_text(messages))
+        context = await context_window.fit(messages)
 
     # Step 1: Call LLM with tools enabled
-    response = await call_openai_chat(messages, tools)
+    with timed(chat_stage_seconds, "llm_tools", stage="llm_tools"):
+        response = await call_openai_chat(context, tools)
     # logger.debug(f"LLM Response: {response.choices[0].model_dump()}")
 
     # Step 2: If LLM wants to call a function/tool
     if response.choices[0].finish_reason == "tool_calls":
         tool_calls = response.choices[0].message.tool_calls
         logger.debug(f"Tool Calls: {tool_calls}")
-        for tool_call in tool_calls:
-            result = await handle_function_call(tool_call)
+        with timed(chat_stage_seconds, "tools", stage="tools"):
+            results = await handle_function_calls(tool_calls)
 
-            messages.append(response.choices[0].message.model_dump())  # tool call message
+        messages.append(response.choices[0].message.model_dump())  # tool call message
+        for tool_call, result in zip(tool_calls, results):
             messages.append({
                 "role": "tool",
                 "tool_call_id": tool_call.id,
@@ -128,13 +216,39 @@ async def chat_with_agent(req: ChatRequest):
             })
 
         # Step 3: Follow-up LLM response after tool result
-        final_response = await call_openai_chat(messages)
+        with timed(chat_stage_seconds, "llm_followup", stage="llm_followup"):
+            final_response = await call_openai_chat(await context_window.fit(messages))
         response_text = final_response.choices[0].message.content
-        log_conversation_history(messages, response_text)
+        with timed(chat_stage_seconds, "history", stage="history"):
+            await turn.finish(messages, response_text)
 
-        return {"response": response_text}
+        return chat_response(turn, response_text)
 
     # If no tool call, return LLM's original answer
     response_text = response.choices[0].message.content
-    log_conversation_history(messages, response_text)
-    return {"response": response_text}
\ No newline at end of file
+    await cache_answer(question, messages, response_text)
+    with timed(chat_stage_seconds, "history", stage="history"):
+        await turn.finish(messages, response_text)
+    return chat_response(turn, response_text)
+
+
+@app.post("/chat/stream")
+async def chat_with_agent_stream(req: ChatRequest):
+    turn = await start_turn(req)
+    question = cacheable_question(turn.messages)
+    cached = await cached_answer(question)
+    if cached is not None:
+        await turn.finish(turn.messages, cached)
+        stream = cached_stream(cached)
+    else:
+        async def on_complete(conversation: List[Dict[str, Any]], response_text: str):
+            await cache_answer(question, conversation, response_text)
+            await turn.finish(conversation, response_text)
+
+        messages = with_system_message(turn.messages)
+        stream = stream_chat(messages, prompt_cache.tools(recent_user_text(messages)), on_complete)
+    return StreamingResponse(
+        stream,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no", **turn.headers()},
+    )
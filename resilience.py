@@ -0,0 +1,211 @@
+# resilience.py
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+from metrics import registry
+
+logger = logging.getLogger(__name__)
+
+# Responses worth another attempt; other statuses are returned to the caller as-is
+RETRYABLE_STATUS = frozenset({429, 502, 503, 504})
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+scoring_retries_total = registry.counter("scoring_retries_total", "Scoring attempts retried, by backend.")
+scoring_hedges_total = registry.counter("scoring_hedges_total", "Hedged scoring requests sent, by backend.")
+scoring_rejections_total = registry.counter("scoring_rejections_total", "Scoring calls failed fast by an open circuit.")
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a backend whose circuit breaker is open."""
+
+    def __init__(self, backend: str, retry_after: float):
+        super().__init__(f"{backend} scoring backend is unavailable (circuit open)")
+        self.backend = backend
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures and fails fast for
+    `reset_timeout` seconds, then lets a single trial call through.
+    """
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+
+    def allow(self) -> None:
+        if self.state == CLOSED:
+            return
+        if self.state == OPEN:
+            remaining = self._opened_at + self.reset_timeout - time.monotonic()
+            if remaining > 0:
+                scoring_rejections_total.inc(backend=self.name)
+                raise CircuitOpenError(self.name, remaining)
+            self.state = HALF_OPEN
+        if self._trial_in_flight:
+            scoring_rejections_total.inc(backend=self.name)
+            raise CircuitOpenError(self.name, self.reset_timeout)
+        self._trial_in_flight = True
+
+    def record_success(self) -> None:
+        self._failures = 0
+        self._trial_in_flight = False
+        if self.state != CLOSED:
+            logger.info(f"Circuit for {self.name} closed")
+        self.state = CLOSED
+
+    def abandon_trial(self) -> None:
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        self._trial_in_flight = False
+        if self.state == HALF_OPEN or self._failures >= self.failure_threshold:
+            if self.state != OPEN:
+                logger.warning(f"Circuit for {self.name} opened after {self._failures} failures")
+            self.state = OPEN
+            self._opened_at = time.monotonic()
+
+
+class LatencyTracker:
+    """
+    Recent successful latencies of one backend, for the hedging threshold.
+    """
+
+    def __init__(self, window: int = 200, recompute_every: int = 20):
+        self._samples: deque = deque(maxlen=window)
+        self._recompute_every = recompute_every
+        self._since_recompute = 0
+        self._cached: Dict[float, float] = {}
+
+    def observe(self, seconds: float) -> None:
+        self._samples.append(seconds)
+        self._since_recompute += 1
+        if self._since_recompute >= self._recompute_every:
+            self._since_recompute = 0
+            self._cached.clear()
+
+    def percentile(self, percentile: float, min_samples: int) -> Optional[float]:
+        if len(self._samples) < min_samples:
+            return None
+        value = self._cached.get(percentile)
+        if value is None:
+            ordered = sorted(self._samples)
+            index = min(len(ordered) - 1, int(len(ordered) * percentile / 100.0))
+            value = self._cached[percentile] = ordered[index]
+        return value
+
+
+class ResilientCaller:
+    """
+    Wraps outbound calls to one scoring backend with a deadline, jittered
+    exponential-backoff retries, a circuit breaker and optional hedging.
+    """
+
+    def __init__(self, name: str, cfg: Dict[str, Any]):
+        self.name = name
+        self.timeout = cfg["timeout"]
+        self.deadline = cfg["deadline"]
+        self.retries = cfg["retries"]
+        self.retry_base_delay = cfg["retry_base_delay"]
+        self.retry_max_delay = cfg["retry_max_delay"]
+        self.hedge_percentile = cfg["hedge_percentile"]
+        self.hedge_min_samples = cfg["hedge_min_samples"]
+        self.breaker = CircuitBreaker(name, cfg["breaker_failures"], cfg["breaker_reset"])
+        self.latency = LatencyTracker()
+
+    async def call(self, send: Callable[[float], Awaitable[httpx.Response]]) -> httpx.Response:
+        """
+        `send(timeout)` performs one attempt with the given timeout in seconds.
+        """
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            self.breaker.allow()
+            remaining = self.deadline - (time.monotonic() - started)
+            try:
+                response = await self._hedged(send, min(self.timeout, max(remaining, 0.001)))
+            except httpx.TransportError:
+                self.breaker.record_failure()
+                if not self._should_retry(attempt, started):
+                    raise
+            except BaseException:
+                # Cancelled or unexpected errors say nothing about backend health
+                self.breaker.abandon_trial()
+                raise
+            else:
+                if response.status_code >= 500:
+                    self.breaker.record_failure()
+                else:
+                    self.breaker.record_success()
+                if response.status_code not in RETRYABLE_STATUS or not self._should_retry(attempt, started):
+                    return response
+
+            attempt += 1
+            scoring_retries_total.inc(backend=self.name)
+            await asyncio.sleep(self._backoff(attempt))
+
+    def _backoff(self, attempt: int) -> float:
+        # Full jitter keeps retries from many requests from arriving together
+        return random.uniform(0, min(self.retry_max_delay, self.retry_base_delay * (2 ** (attempt - 1))))
+
+    def _should_retry(self, attempt: int, started: float) -> bool:
+        if attempt >= self.retries:
+            return False
+        elapsed = time.monotonic() - started
+        # Not worth retrying if the backoff alone would use up the deadline
+        return elapsed + self.retry_base_delay < self.deadline
+
+    async def _timed(self, send: Callable[[float], Awaitable[httpx.Response]], timeout: float) -> httpx.Response:
+        started = time.perf_counter()
+        response = await send(timeout)
+        if response.status_code < 500:
+            self.latency.observe(time.perf_counter() - started)
+        return response
+
+    async def _hedged(self, send: Callable[[float], Awaitable[httpx.Response]], timeout: float) -> httpx.Response:
+        threshold = None
+        if self.hedge_percentile > 0:
+            threshold = self.latency.percentile(self.hedge_percentile, self.hedge_min_samples)
+        if threshold is None or threshold >= timeout:
+            return await self._timed(send, timeout)
+
+        tasks: List[asyncio.Task] = [asyncio.create_task(self._timed(send, timeout))]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=threshold)
+            if not done:
+                scoring_hedges_total.inc(backend=self.name)
+                tasks.append(asyncio.create_task(self._timed(send, max(timeout - threshold, 0.001))))
+
+            pending = set(tasks)
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    def metric_lines(self) -> List[str]:
+        state = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}[self.breaker.state]
+        return [f'scoring_circuit_state{{backend="{self.name}"}} {state}']
@@ -0,0 +1,188 @@
+# retrieval.py
+import hashlib
+import logging
+import os
+import re
+from typing import List, Optional
+
+import numpy as np
+
+from config import KB_TOP_K, KB_CHUNK_CHARS, KB_INDEX_PATH
+
+logger = logging.getLogger(__name__)
+
+# Bumped whenever chunking or tokenization changes, so stale indexes are rebuilt
+INDEX_FORMAT = 1
+
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset(
+    "a an and are as at be by can do does for from how i in is it me my of on or our "
+    "so that the this to us we what which who why will with you your".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in _TOKEN_RE.findall(text.lower()) if token not in STOPWORDS]
+
+
+def chunk_text(text: str, max_chars: int = KB_CHUNK_CHARS) -> List[str]:
+    """
+    Splits the knowledge base at markdown headings, then splits any section
+    longer than max_chars at line boundaries.
+    """
+    sections: List[List[str]] = []
+    has_body = False
+    for line in text.splitlines():
+        if line.lstrip().startswith("#") and has_body:
+            sections.append([])
+            has_body = False
+        if not sections:
+            sections.append([])
+        sections[-1].append(line)
+        if line.strip() and not line.lstrip().startswith("#"):
+            has_body = True
+
+    chunks: List[str] = []
+    for section in sections:
+        current = ""
+        for line in section:
+            if current and len(current) + len(line) + 1 > max_chars:
+                chunks.append(current.strip())
+                current = ""
+            current += line + "\n"
+        if current.strip():
+            chunks.append(current.strip())
+    return chunks
+
+
+class KnowledgeIndex:
+    """
+    In-memory BM25 index over knowledge base chunks. Postings are stored as
+    CSR-style NumPy arrays so a query only touches the rows of its terms.
+    """
+
+    def __init__(self, chunks: List[str], kb_hash: str):
+        self.chunks = chunks
+        self.kb_hash = kb_hash
+        self.vocab: dict = {}
+        self.indptr = np.zeros(1, dtype=np.int64)
+        self.doc_ids = np.zeros(0, dtype=np.int32)
+        self.weights = np.zeros(0, dtype=np.float32)
+        self.idf = np.zeros(0, dtype=np.float32)
+
+    @classmethod
+    def build(cls, text: str, max_chars: int = KB_CHUNK_CHARS) -> "KnowledgeIndex":
+        index = cls(chunk_text(text, max_chars), kb_hash(text, max_chars))
+        postings: dict = {}
+        doc_len = np.zeros(len(index.chunks), dtype=np.float32)
+        for doc_id, chunk in enumerate(index.chunks):
+            tokens = tokenize(chunk)
+            doc_len[doc_id] = len(tokens)
+            counts: dict = {}
+            for token in tokens:
+                counts[token] = counts.get(token, 0) + 1
+            for token, count in counts.items():
+                postings.setdefault(token, []).append((doc_id, count))
+
+        terms = sorted(postings)
+        index.vocab = {term: i for i, term in enumerate(terms)}
+        lengths = np.array([len(postings[term]) for term in terms], dtype=np.int64)
+        index.indptr = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+        pairs = np.array([pair for term in terms for pair in postings[term]], dtype=np.float32).reshape(-1, 2)
+        index.doc_ids = pairs[:, 0].astype(np.int32)
+        tf = pairs[:, 1]
+
+        # Precompute the full BM25 term weight per posting; queries only sum them
+        n_docs = max(len(index.chunks), 1)
+        avg_len = float(doc_len.mean()) if len(doc_len) else 1.0
+        index.idf = np.log(1.0 + (n_docs - lengths + 0.5) / (lengths + 0.5)).astype(np.float32)
+        norm = BM25_K1 * (1.0 - BM25_B + BM25_B * doc_len[index.doc_ids] / max(avg_len, 1.0))
+        term_idf = np.repeat(index.idf, lengths)
+        index.weights = (term_idf * tf * (BM25_K1 + 1.0) / (tf + norm)).astype(np.float32)
+        return index
+
+    def search(self, query: str, top_k: int = KB_TOP_K) -> List[int]:
+        """
+        Returns the ids of the top_k chunks with a positive score, best first.
+        """
+        term_ids = {self.vocab[token] for token in tokenize(query) if token in self.vocab}
+        if not term_ids or top_k <= 0:
+            return []
+        scores = np.zeros(len(self.chunks), dtype=np.float32)
+        for term_id in term_ids:
+            start, end = self.indptr[term_id], self.indptr[term_id + 1]
+            np.add.at(scores, self.doc_ids[start:end], self.weights[start:end])
+        top_k = min(top_k, len(self.chunks))
+        candidates = np.argpartition(-scores, top_k - 1)[:top_k]
+        candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return [int(doc_id) for doc_id in candidates if scores[doc_id] > 0]
+
+    def context_for(self, query: str, top_k: int = KB_TOP_K) -> Optional[str]:
+        """
+        Knowledge base excerpt for a query: the overview chunk plus the top_k matches, in KB order.
+        None when nothing matches (e.g. an all-stopword "what do you do"), so the caller can
+        fall back to the whole knowledge base instead of sending the overview alone.
+        """
+        matches = self.search(query, top_k)
+        if not matches:
+            return None
+        doc_ids = sorted({0, *matches})
+        return "\n\n".join(self.chunks[doc_id] for doc_id in doc_ids)
+
+    def save(self, path: str = KB_INDEX_PATH) -> None:
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        terms = sorted(self.vocab, key=self.vocab.get)
+        # Per-process temp file, so workers building at the same time do not clobber each other
+        tmp_path = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez(
+            tmp_path,
+            format=np.array(INDEX_FORMAT),
+            kb_hash=np.array(self.kb_hash),
+            chunks=np.array(self.chunks, dtype=str),
+            terms=np.array(terms, dtype=str),
+            indptr=self.indptr,
+            doc_ids=self.doc_ids,
+            weights=self.weights,
+            idf=self.idf,
+        )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str = KB_INDEX_PATH) -> Optional["KnowledgeIndex"]:
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                if int(data["format"]) != INDEX_FORMAT:
+                    return None
+                index = cls([str(chunk) for chunk in data["chunks"]], str(data["kb_hash"]))
+                index.vocab = {str(term): i for i, term in enumerate(data["terms"])}
+                index.indptr = data["indptr"]
+                index.doc_ids = data["doc_ids"]
+                index.weights = data["weights"]
+                index.idf = data["idf"]
+        except (FileNotFoundError, KeyError, ValueError, OSError):
+            return None
+        return index
+
+
+def kb_hash(text: str, max_chars: int = KB_CHUNK_CHARS) -> str:
+    return hashlib.sha256(f"{INDEX_FORMAT}:{max_chars}:{text}".encode("utf-8")).hexdigest()
+
+
+def load_or_build_index(text: str, path: str = KB_INDEX_PATH) -> KnowledgeIndex:
+    """
+    Reuses the persisted index when it was built from the same knowledge base,
+    otherwise rebuilds and persists it.
+    """
+    index = KnowledgeIndex.load(path)
+    if index is not None and index.kb_hash == kb_hash(text):
+        return index
+    index = KnowledgeIndex.build(text)
+    try:
+        index.save(path)
+    except OSError as e:
+        logger.warning(f"Could not persist knowledge base index to {path}: {e}")
+    logger.info(f"Built knowledge base index with {len(index.chunks)} chunks")
+    return index
@@ -1,9 +1,25 @@
 # routers/scoring.py
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
+
+from config import BATCH_MAX_BYTES
 
 router = APIRouter()
 
+# Scoring rules shared by the single-row and batch endpoints
+BASE_SCORE = 300  # Minimum score
+MAX_SCORE = 850  # Common credit score max
+AGE_THRESHOLD, AGE_POINTS = 30, 50
+TECH_SECTOR, TECH_POINTS = "tech", 100
+BONUS_REGION, REGION_POINTS = "california", 20
+BONUS_GENDER, GENDER_POINTS = "male", 10
+MODEL_NAME = "Micro Model"
+
+SCORE_FIELDS = ["gender", "age", "business_sector", "region"]
+BATCH_CHUNK_ROWS = 5000
+
 # Define a Pydantic model to match the expected input from the micro function
 class ScoreRequest(BaseModel):
     gender: str
@@ -11,24 +27,66 @@ class ScoreRequest(BaseModel):
     business_sector: str
     region: str
 
-@router.post("/example")
-async def get_score_data(request: ScoreRequest):
+def score_applicant(gender: str, age: int, business_sector: str, region: str) -> int:
     # Example logic to calculate a score (replace with your actual scoring logic)
-    base_score = 300  # Minimum score
-    if request.age >= 30:
-        base_score += 50  # Add points for age
-    if request.business_sector.lower() == "tech":
-        base_score += 100  # Add points for tech sector
-    if request.region.lower() == "california":
-        base_score += 20  # Add points for region
-    if request.gender.lower() == "male":
-        base_score += 10  # Add points for gender (example adjustment)
+    base_score = BASE_SCORE
+    if age >= AGE_THRESHOLD:
+        base_score += AGE_POINTS  # Add points for age
+    if business_sector.lower() == TECH_SECTOR:
+        base_score += TECH_POINTS  # Add points for tech sector
+    if region.lower() == BONUS_REGION:
+        base_score += REGION_POINTS  # Add points for region
+    if gender.lower() == BONUS_GENDER:
+        base_score += GENDER_POINTS  # Add points for gender (example adjustment)
 
     # Cap the score at 850 (common credit score max)
-    final_score = min(base_score, 850)
+    return min(base_score, MAX_SCORE)
+
+@router.post("/example")
+async def get_score_data(request: ScoreRequest):
+    final_score = score_applicant(request.gender, request.age, request.business_sector, request.region)
 
     return {
         "score": final_score,
-        "model": "Micro Model",
+        "model": MODEL_NAME,
         "user_id": f"cust_{request.gender}_{request.age}"  # Dynamic user_id based on input
-    }
\ No newline at end of file
+    }
+
+async def _read_body(request: Request, max_bytes: int = BATCH_MAX_BYTES) -> bytes:
+    # Checked while streaming too, since Content-Length may be absent (chunked uploads)
+    declared = request.headers.get("content-length")
+    if declared is not None and declared.isdigit() and int(declared) > max_bytes:
+        raise HTTPException(status_code=413, detail=f"Batch body exceeds {max_bytes} bytes")
+    chunks = []
+    size = 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > max_bytes:
+            raise HTTPException(status_code=413, detail=f"Batch body exceeds {max_bytes} bytes")
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+def _score_batch(body: bytes, content_type: str):
+    # Imported here, inside the thread pool, so the first batch does not block the loop importing pandas
+    from routers.scoring_batch import score_batch, iter_ndjson, BatchParseError
+
+    try:
+        frame, scores = score_batch(body, content_type)
+    except BatchParseError as e:
+        raise ValueError(str(e)) from e
+    return iter_ndjson(frame, scores)
+
+@router.post("/batch")
+async def get_batch_score_data(request: Request):
+    """
+    Scores many applicants at once. Accepts a JSON array, NDJSON or CSV body
+    (by Content-Type) and streams one NDJSON result per input row, in order.
+    """
+    body = await _read_body(request)
+    try:
+        # Parsing and scoring large batches takes long enough to stall other requests on the loop
+        results = await run_in_threadpool(_score_batch, body, request.headers.get("content-type", ""))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    return StreamingResponse(results, media_type="application/x-ndjson")
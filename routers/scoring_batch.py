@@ -0,0 +1,86 @@
+# routers/scoring_batch.py
+# Vectorized batch scoring; kept apart from routers/scoring.py so pandas is only imported when a batch arrives
+import io
+import json
+from typing import Iterator, Tuple
+
+import numpy as np
+import pandas as pd
+
+from routers.scoring import (
+    BASE_SCORE,
+    MAX_SCORE,
+    AGE_THRESHOLD,
+    AGE_POINTS,
+    TECH_SECTOR,
+    TECH_POINTS,
+    BONUS_REGION,
+    REGION_POINTS,
+    BONUS_GENDER,
+    GENDER_POINTS,
+    MODEL_NAME,
+    SCORE_FIELDS,
+    BATCH_CHUNK_ROWS,
+)
+
+BatchParseError = pd.errors.ParserError
+
+
+def score_frame(frame: pd.DataFrame) -> np.ndarray:
+    """
+    Vectorized score_applicant over a validated frame; returns one score per row.
+    """
+    scores = np.full(len(frame), BASE_SCORE, dtype=np.int64)
+    scores += np.where(frame["age"].to_numpy() >= AGE_THRESHOLD, AGE_POINTS, 0)
+    scores += np.where(frame["business_sector"].str.lower().to_numpy() == TECH_SECTOR, TECH_POINTS, 0)
+    scores += np.where(frame["region"].str.lower().to_numpy() == BONUS_REGION, REGION_POINTS, 0)
+    scores += np.where(frame["gender"].str.lower().to_numpy() == BONUS_GENDER, GENDER_POINTS, 0)
+    return np.minimum(scores, MAX_SCORE)
+
+def read_batch(body: bytes, content_type: str) -> pd.DataFrame:
+    if "csv" in content_type:
+        return pd.read_csv(io.BytesIO(body), dtype=str, keep_default_na=False)
+    if "ndjson" in content_type or "jsonl" in content_type:
+        rows = [json.loads(line) for line in body.splitlines() if line.strip()]
+    else:
+        rows = json.loads(body)
+    if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+        raise ValueError("Expected a JSON array of objects")
+    return pd.DataFrame.from_records(rows, columns=SCORE_FIELDS)
+
+def validate_batch(frame: pd.DataFrame) -> pd.DataFrame:
+    missing = [field for field in SCORE_FIELDS if field not in frame.columns]
+    if missing:
+        raise ValueError(f"Missing columns: {', '.join(missing)}")
+    frame = frame[SCORE_FIELDS].copy()
+
+    age = pd.to_numeric(frame["age"], errors="coerce")
+    bad_age = age.isna() | (age % 1 != 0)
+    if bad_age.any():
+        raise ValueError(f"Invalid age in rows: {frame.index[bad_age][:10].tolist()}")
+    frame["age"] = age.astype(np.int64)
+
+    for field in ("gender", "business_sector", "region"):
+        missing_value = frame[field].isna()
+        if missing_value.any():
+            raise ValueError(f"Missing {field} in rows: {frame.index[missing_value][:10].tolist()}")
+        frame[field] = frame[field].astype(str)
+    return frame
+
+def iter_ndjson(frame: pd.DataFrame, scores: np.ndarray) -> Iterator[str]:
+    for start in range(0, len(frame), BATCH_CHUNK_ROWS):
+        chunk = frame.iloc[start:start + BATCH_CHUNK_ROWS]
+        result = pd.DataFrame({
+            "score": scores[start:start + BATCH_CHUNK_ROWS],
+            "model": MODEL_NAME,
+            "user_id": "cust_" + chunk["gender"] + "_" + chunk["age"].astype(str),
+        })
+        yield result.to_json(orient="records", lines=True, force_ascii=False)
+
+
+def score_batch(body: bytes, content_type: str) -> Tuple[pd.DataFrame, np.ndarray]:
+    """
+    Parses, validates and scores a batch body. CPU-bound; run it off the event loop.
+    """
+    frame = validate_batch(read_batch(body, content_type))
+    return frame, score_frame(frame)
@@ -0,0 +1,151 @@
+# routers/structured.py
+import asyncio
+import json
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Type
+
+import httpx
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel
+
+from tool_registry import tool_registry
+from utils import call_openai_chat, call_tool
+from tool_executor import ToolBusyError
+from resilience import CircuitOpenError
+from context_cache import prompt_cache
+from shared_state import SharedCache, shared_cache
+from config import EXPLANATION_TTL, EXPLANATION_MAX_ENTRIES
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+class StructuredScoreResponse(BaseModel):
+    tool: str
+    result: Any
+    explanation_id: Optional[str] = None
+
+
+class ExplanationResponse(BaseModel):
+    status: str  # "pending", "done" or "error"
+    explanation: Optional[str] = None
+
+
+class ExplanationStore:
+    """
+    Bounded, expiring store of explanations produced in the background.
+    With a shared cache, entries are also published there, so any worker
+    can answer the poll for an explanation started on another.
+    """
+
+    def __init__(
+        self,
+        ttl: float = EXPLANATION_TTL,
+        max_entries: int = EXPLANATION_MAX_ENTRIES,
+        shared: Optional[SharedCache] = shared_cache,
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.shared = shared
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._tasks = set()
+
+    async def create(self, tool: str, args: Dict[str, Any], result: Any) -> str:
+        explanation_id = uuid.uuid4().hex
+        self._entries[explanation_id] = {"status": "pending", "explanation": None, "expires_at": time.monotonic() + self.ttl}
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        await self._publish(explanation_id, {"status": "pending", "explanation": None})
+        task = asyncio.create_task(self._explain(explanation_id, tool, args, result))
+        # Keep a reference so the task is not garbage collected mid-flight
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return explanation_id
+
+    async def get(self, explanation_id: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(explanation_id)
+        if entry is not None and entry["expires_at"] < time.monotonic():
+            self._entries.pop(explanation_id, None)
+            entry = None
+        if entry is None and self.shared is not None:
+            try:
+                entry = await self.shared.get("explanation", explanation_id)
+            except Exception as e:
+                logger.warning(f"Shared explanation read failed: {e}")
+        return entry
+
+    async def _publish(self, explanation_id: str, entry: Dict[str, Any]) -> None:
+        if self.shared is None:
+            return
+        try:
+            await self.shared.set("explanation", explanation_id, entry, self.ttl)
+        except Exception as e:
+            logger.warning(f"Shared explanation write failed: {e}")
+
+    async def _explain(self, explanation_id: str, tool: str, args: Dict[str, Any], result: Any) -> None:
+        question = (
+            f"Explain this {tool} credit score. Applicant data: {json.dumps(args, ensure_ascii=False)}. "
+            f"Score result: {json.dumps(result, ensure_ascii=False, default=str)}"
+        )
+        try:
+            response = await call_openai_chat([
+                prompt_cache.system_message(question),
+                {"role": "user", "content": question},
+            ])
+            update = {"status": "done", "explanation": response.choices[0].message.content}
+        except Exception as e:
+            logger.error(f"Explanation for {tool} failed: {e}")
+            update = {"status": "error", "explanation": None}
+        entry = self._entries.get(explanation_id)
+        if entry is not None:
+            entry.update(update)
+        await self._publish(explanation_id, update)
+
+
+explanations = ExplanationStore()
+
+
+def _make_endpoint(tool_name: str, request_model: Type[BaseModel]):
+    async def score(request: request_model, explain: bool = False) -> StructuredScoreResponse:
+        args = request.model_dump()
+        try:
+            result = await call_tool(tool_name, args)
+        except asyncio.TimeoutError:
+            raise HTTPException(status_code=504, detail=f"`{tool_name}` scoring timed out")
+        except ToolBusyError as e:
+            raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+        except CircuitOpenError as e:
+            raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(max(1, round(e.retry_after)))})
+        except httpx.HTTPError as e:
+            raise HTTPException(status_code=502, detail=f"`{tool_name}` scoring backend failed: {e}")
+
+        explanation_id = await explanations.create(tool_name, args, result) if explain else None
+        return StructuredScoreResponse(tool=tool_name, result=result, explanation_id=explanation_id)
+
+    return score
+
+
+@router.get("/explanations/{explanation_id}", response_model=ExplanationResponse)
+async def get_explanation(explanation_id: str):
+    entry = await explanations.get(explanation_id)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="Explanation not found or expired")
+    return ExplanationResponse(status=entry["status"], explanation=entry["explanation"])
+
+
+# One typed endpoint per scoring tool, validated by the same model as LLM tool calls
+for _spec in tool_registry:
+    if not _spec.structured:
+        continue
+    router.add_api_route(
+        f"/{_spec.name}",
+        _make_endpoint(_spec.name, _spec.model),
+        methods=["POST"],
+        response_model=StructuredScoreResponse,
+        summary=f"Score directly with the `{_spec.name}` tool",
+        description=_spec.description,
+    )
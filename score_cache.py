@@ -0,0 +1,163 @@
+# score_cache.py
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from config import SCORE_CACHE_MAX_ENTRIES, SCORE_CACHE_TTLS
+from metrics import registry
+from shared_state import SharedCache, shared_cache
+
+logger = logging.getLogger(__name__)
+
+# Resolves an in-flight future whose caller was cancelled before the call finished
+_ABANDONED = object()
+
+
+def normalize_value(value: Any) -> Any:
+    """
+    Canonical form of a tool argument: trimmed, lower-cased strings with
+    collapsed whitespace, and whole floats folded into ints.
+    """
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str):
+        return " ".join(value.split()).lower()
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, dict):
+        return {str(k): normalize_value(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [normalize_value(v) for v in value]
+    return value
+
+
+def make_key(tool: str, args: Dict[str, Any]) -> str:
+    return tool + ":" + json.dumps(normalize_value(args), sort_keys=True, separators=(",", ":"))
+
+
+class ScoreCache:
+    """
+    Bounded LRU of scoring results with a TTL per tool. Concurrent identical
+    requests share a single backend call. Failed calls are never cached.
+    With a shared cache, results are also reused across worker processes.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = SCORE_CACHE_MAX_ENTRIES,
+        ttls: Dict[str, float] = SCORE_CACHE_TTLS,
+        shared: Optional[SharedCache] = shared_cache,
+    ):
+        self.max_entries = max_entries
+        self.ttls = ttls
+        self.shared = shared
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._stats = {tool: {"hits": 0, "shared_hits": 0, "misses": 0, "coalesced": 0, "evictions": 0} for tool in ttls}
+
+    def caches(self, tool: str) -> bool:
+        return self.ttls.get(tool, 0) > 0
+
+    async def get_or_call(self, tool: str, args: Dict[str, Any], call: Callable[[], Awaitable[Any]]) -> Any:
+        key = make_key(tool, args)
+        stats = self._stats[tool]
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                stats["hits"] += 1
+                return entry[1]
+            del self._entries[key]
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            stats["coalesced"] += 1
+            value = await asyncio.shield(inflight)
+            if value is not _ABANDONED:
+                return value
+            # The caller making the request was cancelled; the first waiter to get here repeats it
+            return await self.get_or_call(tool, args, call)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await self._shared_get(key)
+            if value is not None:
+                stats["shared_hits"] += 1
+            else:
+                stats["misses"] += 1
+                value = await call()
+                await self._shared_set(tool, key, value)
+        except asyncio.CancelledError:
+            # Cancelling the shared future would cancel every waiter along with this caller
+            future.set_result(_ABANDONED)
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved so an exception nobody waited on is not reported
+            future.exception()
+            raise
+        else:
+            self._store(tool, key, value)
+            future.set_result(value)
+            return value
+        finally:
+            self._inflight.pop(key, None)
+
+    async def _shared_get(self, key: str) -> Optional[Any]:
+        if self.shared is None:
+            return None
+        try:
+            return await self.shared.get("score", key)
+        except Exception as e:
+            logger.warning(f"Shared score cache read failed: {e}")
+            return None
+
+    async def _shared_set(self, tool: str, key: str, value: Any) -> None:
+        if self.shared is None:
+            return
+        try:
+            await self.shared.set("score", key, value, self.ttls[tool])
+        except Exception as e:
+            logger.warning(f"Shared score cache write failed: {e}")
+
+    def _store(self, tool: str, key: str, value: Any) -> None:
+        self._entries[key] = (time.monotonic() + self.ttls[tool], value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            evicted_key, _ = self._entries.popitem(last=False)
+            self._stats[evicted_key.split(":", 1)[0]]["evictions"] += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "tools": {tool: dict(counts) for tool, counts in self._stats.items()},
+        }
+
+    def metric_lines(self) -> List[str]:
+        """
+        Prometheus exposition of the cache counters, rendered at scrape time.
+        """
+        lines = [
+            "# HELP score_cache_entries Scoring results currently cached.",
+            "# TYPE score_cache_entries gauge",
+            f"score_cache_entries {len(self._entries)}",
+            "# HELP score_cache_events_total Scoring cache lookups by tool and result.",
+            "# TYPE score_cache_events_total counter",
+        ]
+        for tool, counts in self._stats.items():
+            for event, count in counts.items():
+                lines.append(f'score_cache_events_total{{tool="{tool}",event="{event}"}} {count}')
+        return lines
+
+
+score_cache = ScoreCache()
+registry.add_collector(score_cache.metric_lines)
@@ -0,0 +1,96 @@
+# scoring_clients.py
+import importlib.util
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from config import SCORING_BACKENDS, SCORING_HTTP2
+from metrics import registry, scoring_request_seconds
+from resilience import ResilientCaller
+
+logger = logging.getLogger(__name__)
+
+# HTTP/2 needs the optional `h2` package; fall back to HTTP/1.1 keep-alive without it
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+class ScoringClients:
+    """
+    One pooled httpx.AsyncClient per scoring backend, opened in the app lifespan
+    and reused across requests so scores skip the TCP/TLS handshake.
+    Every call goes through the backend's retry, circuit breaker and hedging policy.
+    """
+
+    def __init__(self, backends: Dict[str, Dict[str, Any]]):
+        self.backends = backends
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self.callers = {name: ResilientCaller(name, cfg) for name, cfg in backends.items()}
+
+    def _build(self, name: str) -> httpx.AsyncClient:
+        cfg = self.backends[name]
+        return httpx.AsyncClient(
+            http2=SCORING_HTTP2 and HTTP2_AVAILABLE,
+            timeout=httpx.Timeout(cfg["timeout"], connect=cfg["connect_timeout"]),
+            limits=httpx.Limits(
+                max_connections=cfg["max_connections"],
+                max_keepalive_connections=cfg["max_keepalive_connections"],
+                keepalive_expiry=cfg["keepalive_expiry"],
+            ),
+        )
+
+    async def start(self) -> None:
+        for name in self.backends:
+            if name not in self._clients:
+                self._clients[name] = self._build(name)
+        logger.info(f"Scoring clients ready: {', '.join(self._clients)} (http2={SCORING_HTTP2 and HTTP2_AVAILABLE})")
+
+    async def close(self) -> None:
+        clients, self._clients = self._clients, {}
+        for client in clients.values():
+            await client.aclose()
+
+    def get(self, name: str) -> httpx.AsyncClient:
+        client = self._clients.get(name)
+        if client is None:
+            # Outside the app lifespan (scripts, tests); create on first use
+            client = self._clients[name] = self._build(name)
+        return client
+
+    def url(self, name: str) -> str:
+        return self.backends[name]["url"]
+
+    async def post(self, name: str, json: Optional[Dict[str, Any]] = None) -> httpx.Response:
+        client = self.get(name)
+        url = self.url(name)
+        connect_timeout = self.backends[name]["connect_timeout"]
+
+        async def attempt(timeout: float) -> httpx.Response:
+            started = time.perf_counter()
+            status = "error"
+            try:
+                response = await client.post(
+                    url,
+                    json=json,
+                    timeout=httpx.Timeout(timeout, connect=min(timeout, connect_timeout)),
+                )
+                status = str(response.status_code)
+                return response
+            finally:
+                scoring_request_seconds.observe(time.perf_counter() - started, backend=name, status=status)
+
+        return await self.callers[name].call(attempt)
+
+    def metric_lines(self) -> List[str]:
+        lines = [
+            "# HELP scoring_circuit_state Circuit breaker state per backend (0 closed, 1 half open, 2 open).",
+            "# TYPE scoring_circuit_state gauge",
+        ]
+        for caller in self.callers.values():
+            lines.extend(caller.metric_lines())
+        return lines
+
+
+scoring_clients = ScoringClients(SCORING_BACKENDS)
+registry.add_collector(scoring_clients.metric_lines)
@@ -0,0 +1,212 @@
+# sessions.py
+import asyncio
+import json
+import sqlite3
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import (
+    SESSION_BACKEND,
+    SESSION_SQLITE_PATH,
+    SESSION_MAX_SESSIONS,
+    SESSION_MAX_MESSAGES,
+    SESSION_TTL,
+)
+from shared_state import SQLiteDatabase
+
+
+def new_session_id() -> str:
+    return uuid.uuid4().hex
+
+
+def trim_start(roles: List[str], max_messages: int) -> int:
+    """
+    Index to keep messages from so at most max_messages remain, moved forward
+    to a user message so a tool result never outlives its tool call. If the
+    last turn alone is longer, that whole turn is kept.
+    """
+    cut = len(roles) - max_messages
+    if cut <= 0:
+        return 0
+    user_indexes = [i for i, role in enumerate(roles) if role == "user"]
+    for i in user_indexes:
+        if i >= cut:
+            return i
+    return user_indexes[-1] if user_indexes else len(roles)
+
+
+class SessionStore(ABC):
+    """
+    Conversation history kept on the server, so clients only send the new message.
+    System messages are never stored; they are rebuilt for every turn.
+    """
+
+    @abstractmethod
+    async def get(self, session_id: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        The stored messages, or None if the session is unknown or expired.
+        """
+
+    @abstractmethod
+    async def append(self, session_id: str, messages: List[Dict[str, Any]]) -> None:
+        """
+        Appends messages, creating the session if needed.
+        """
+
+    @abstractmethod
+    async def delete(self, session_id: str) -> None:
+        pass
+
+    async def close(self) -> None:
+        pass
+
+
+class MemorySessionStore(SessionStore):
+    """
+    Process-local store with LRU eviction and an idle TTL.
+    """
+
+    def __init__(
+        self,
+        max_sessions: int = SESSION_MAX_SESSIONS,
+        max_messages: int = SESSION_MAX_MESSAGES,
+        ttl: float = SESSION_TTL,
+    ):
+        self.max_sessions = max_sessions
+        self.max_messages = max_messages
+        self.ttl = ttl
+        self._sessions: "OrderedDict[str, Tuple[float, List[Dict[str, Any]]]]" = OrderedDict()
+
+    async def get(self, session_id: str) -> Optional[List[Dict[str, Any]]]:
+        entry = self._sessions.get(session_id)
+        if entry is None:
+            return None
+        if entry[0] + self.ttl < time.monotonic():
+            del self._sessions[session_id]
+            return None
+        self._sessions.move_to_end(session_id)
+        return list(entry[1])
+
+    async def append(self, session_id: str, messages: List[Dict[str, Any]]) -> None:
+        entry = self._sessions.get(session_id)
+        history = entry[1] if entry is not None else []
+        history.extend(messages)
+        if len(history) > self.max_messages:
+            del history[:trim_start([message.get("role") for message in history], self.max_messages)]
+        self._sessions[session_id] = (time.monotonic(), history)
+        self._sessions.move_to_end(session_id)
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+
+    async def delete(self, session_id: str) -> None:
+        self._sessions.pop(session_id, None)
+
+
+class SQLiteSessionStore(SessionStore):
+    """
+    SQLite-backed store; survives restarts and can be shared by several
+    worker processes on one host. Queries run in a worker thread.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS sessions (
+            session_id TEXT PRIMARY KEY,
+            updated_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS sessions_updated_at ON sessions (updated_at);
+        CREATE TABLE IF NOT EXISTS session_messages (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            session_id TEXT NOT NULL,
+            message TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS session_messages_session ON session_messages (session_id, seq);
+    """
+
+    def __init__(
+        self,
+        path: str = SESSION_SQLITE_PATH,
+        max_sessions: int = SESSION_MAX_SESSIONS,
+        max_messages: int = SESSION_MAX_MESSAGES,
+        ttl: float = SESSION_TTL,
+    ):
+        self.path = path
+        self.max_sessions = max_sessions
+        self.max_messages = max_messages
+        self.ttl = ttl
+        self._db = SQLiteDatabase(path, self.SCHEMA)
+
+    def _get(self, session_id: str) -> Optional[List[Dict[str, Any]]]:
+        with self._db.connection() as conn:
+            row = conn.execute("SELECT updated_at FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+            if row is None or row[0] + self.ttl < time.time():
+                return None
+            rows = conn.execute(
+                "SELECT message FROM session_messages WHERE session_id = ? ORDER BY seq", (session_id,)
+            ).fetchall()
+        return [json.loads(message) for (message,) in rows]
+
+    def _append(self, session_id: str, messages: List[Dict[str, Any]]) -> None:
+        encoded = [(session_id, json.dumps(message, ensure_ascii=False)) for message in messages]
+        with self._db.transaction() as conn:
+            conn.executemany("INSERT INTO session_messages (session_id, message) VALUES (?, ?)", encoded)
+            conn.execute(
+                "INSERT INTO sessions (session_id, updated_at) VALUES (?, ?) "
+                "ON CONFLICT(session_id) DO UPDATE SET updated_at = excluded.updated_at",
+                (session_id, time.time()),
+            )
+            self._trim(conn, session_id)
+        if self._db.maintenance_due():
+            self._evict()
+
+    def _trim(self, conn: sqlite3.Connection, session_id: str) -> None:
+        (count,) = conn.execute("SELECT COUNT(*) FROM session_messages WHERE session_id = ?", (session_id,)).fetchone()
+        if count <= self.max_messages:
+            return
+        rows = conn.execute(
+            "SELECT seq, json_extract(message, '$.role') FROM session_messages WHERE session_id = ? ORDER BY seq",
+            (session_id,),
+        ).fetchall()
+        start = trim_start([role for _, role in rows], self.max_messages)
+        if start > 0:
+            first_kept = rows[start][0] if start < len(rows) else rows[-1][0] + 1
+            conn.execute("DELETE FROM session_messages WHERE session_id = ? AND seq < ?", (session_id, first_kept))
+
+    def _evict(self) -> None:
+        with self._db.transaction() as conn:
+            conn.execute(
+                "DELETE FROM sessions WHERE updated_at < ? OR session_id IN "
+                "(SELECT session_id FROM sessions ORDER BY updated_at DESC LIMIT -1 OFFSET ?)",
+                (time.time() - self.ttl, self.max_sessions),
+            )
+            conn.execute("DELETE FROM session_messages WHERE session_id NOT IN (SELECT session_id FROM sessions)")
+
+    def _delete(self, session_id: str) -> None:
+        with self._db.transaction() as conn:
+            conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+            conn.execute("DELETE FROM session_messages WHERE session_id = ?", (session_id,))
+
+    async def get(self, session_id: str) -> Optional[List[Dict[str, Any]]]:
+        return await asyncio.to_thread(self._get, session_id)
+
+    async def append(self, session_id: str, messages: List[Dict[str, Any]]) -> None:
+        await asyncio.to_thread(self._append, session_id, messages)
+
+    async def delete(self, session_id: str) -> None:
+        await asyncio.to_thread(self._delete, session_id)
+
+    async def close(self) -> None:
+        self._db.close()
+
+
+def create_session_store(backend: str = SESSION_BACKEND) -> SessionStore:
+    if backend == "sqlite":
+        return SQLiteSessionStore()
+    if backend == "memory":
+        return MemorySessionStore()
+    raise ValueError(f"Unknown SESSION_BACKEND `{backend}`")
+
+
+session_store = create_session_store()
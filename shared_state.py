@@ -0,0 +1,187 @@
+# shared_state.py
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows; single-process only there
+    fcntl = None
+
+from config import SHARED_STATE_BACKEND, SHARED_STATE_PATH, SHARED_STATE_MAX_ENTRIES
+
+
+@contextmanager
+def file_lock(path: str) -> Iterator[None]:
+    """
+    Exclusive advisory lock on `path`, held across worker processes.
+    """
+    if fcntl is None:
+        yield
+        return
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'a') as lock_file:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+class SQLiteDatabase:
+    """
+    One process's connection to a WAL-mode SQLite file that other worker
+    processes open too. Threads of the process take turns on the connection.
+    It is opened on first use, so it is never inherited across a fork.
+    """
+
+    # Maintenance (pruning, eviction) scans whole tables, so it only runs once per this many writes
+    MAINTENANCE_EVERY = 100
+
+    def __init__(self, path: str, schema: str):
+        self.path = path
+        self.schema = schema
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._writes = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30.0, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(self.schema)
+            self._conn = conn
+        return self._conn
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """
+        The connection in autocommit mode, held exclusively by the caller.
+        """
+        with self._lock:
+            yield self._connect()
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """
+        The connection inside a write transaction, committed on success.
+        """
+        with self._lock:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+            self._writes += 1
+
+    def maintenance_due(self) -> bool:
+        return self._writes > 0 and self._writes % self.MAINTENANCE_EVERY == 0
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+class SharedCache(ABC):
+    """
+    TTL key-value cache visible to every worker process on the host.
+    Process-local caches use it as a second tier behind their own LRU.
+    """
+
+    @abstractmethod
+    async def get(self, namespace: str, key: str) -> Optional[Any]:
+        pass
+
+    @abstractmethod
+    async def set(self, namespace: str, key: str, value: Any, ttl: float) -> None:
+        pass
+
+    async def close(self) -> None:
+        pass
+
+
+class SQLiteSharedCache(SharedCache):
+    """
+    SharedCache in a SQLite file. Values are stored as JSON; values that
+    cannot be encoded stay process-local. Queries run in a worker thread.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS shared_cache (
+            namespace TEXT NOT NULL,
+            key TEXT NOT NULL,
+            value TEXT NOT NULL,
+            expires_at REAL NOT NULL,
+            PRIMARY KEY (namespace, key)
+        );
+        CREATE INDEX IF NOT EXISTS shared_cache_expires_at ON shared_cache (expires_at);
+    """
+
+    def __init__(self, path: str = SHARED_STATE_PATH, max_entries: int = SHARED_STATE_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self._db = SQLiteDatabase(path, self.SCHEMA)
+
+    def _get(self, namespace: str, key: str) -> Optional[Any]:
+        with self._db.connection() as conn:
+            row = conn.execute(
+                "SELECT value FROM shared_cache WHERE namespace = ? AND key = ? AND expires_at > ?",
+                (namespace, key, time.time()),
+            ).fetchone()
+        return json.loads(row[0]) if row is not None else None
+
+    def _set(self, namespace: str, key: str, value: str, ttl: float) -> None:
+        with self._db.transaction() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO shared_cache (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+                (namespace, key, value, time.time() + ttl),
+            )
+        if self._db.maintenance_due():
+            self._prune()
+
+    def _prune(self) -> None:
+        with self._db.transaction() as conn:
+            conn.execute("DELETE FROM shared_cache WHERE expires_at <= ?", (time.time(),))
+            conn.execute(
+                "DELETE FROM shared_cache WHERE rowid IN "
+                "(SELECT rowid FROM shared_cache ORDER BY expires_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    async def get(self, namespace: str, key: str) -> Optional[Any]:
+        return await asyncio.to_thread(self._get, namespace, key)
+
+    async def set(self, namespace: str, key: str, value: Any, ttl: float) -> None:
+        try:
+            encoded = json.dumps(value, ensure_ascii=False)
+        except (TypeError, ValueError):
+            return
+        await asyncio.to_thread(self._set, namespace, key, encoded, ttl)
+
+    async def close(self) -> None:
+        self._db.close()
+
+
+def create_shared_cache(backend: str = SHARED_STATE_BACKEND) -> Optional[SharedCache]:
+    if backend == "sqlite":
+        return SQLiteSharedCache()
+    if backend == "memory":
+        return None
+    raise ValueError(f"Unknown SHARED_STATE_BACKEND `{backend}`")
+
+
+# None when each process only uses its own in-memory caches
+shared_cache = create_shared_cache()
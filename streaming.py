@@ -0,0 +1,107 @@
+# streaming.py
+import json
+import logging
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from utils import CHAT_MODEL, call_openai_chat, handle_function_calls
+from context_window import context_window
+from metrics import timed, chat_stage_seconds, record_usage
+
+logger = logging.getLogger(__name__)
+
+
+def sse_event(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def _collect_tool_call_delta(pending: Dict[int, Dict[str, str]], delta_tool_calls: List[Any]) -> None:
+    # Tool calls arrive in fragments keyed by index; ids and names come once, arguments piecewise
+    for fragment in delta_tool_calls:
+        call = pending.setdefault(fragment.index, {"id": "", "name": "", "arguments": ""})
+        if fragment.id:
+            call["id"] = fragment.id
+        if fragment.function:
+            if fragment.function.name:
+                call["name"] += fragment.function.name
+            if fragment.function.arguments:
+                call["arguments"] += fragment.function.arguments
+
+
+async def cached_stream(response_text: str) -> AsyncIterator[str]:
+    """
+    Replays a cached answer in the same event format as a live stream.
+    """
+    yield sse_event("token", {"content": response_text})
+    yield sse_event("done", {"response": response_text})
+
+
+async def stream_chat(
+    messages: List[Dict[str, Any]],
+    tools: Optional[List[Dict[str, Any]]],
+    on_complete: Callable[[List[Dict[str, Any]], str], Awaitable[None]]
+) -> AsyncIterator[str]:
+    """
+    Streams the agent's answer as Server-Sent Events.
+    Mirrors /chat: one round with tools enabled and, if the model asks for tools,
+    the tools are run and a second round streams the final answer.
+    """
+    response_text = ""
+    try:
+        while True:
+            stream = await call_openai_chat(await context_window.fit(messages), tools, stream=True)
+            content_parts: List[str] = []
+            pending: Dict[int, Dict[str, str]] = {}
+
+            async for chunk in stream:
+                if not chunk.choices:
+                    # The usage-only chunk that ends the stream
+                    record_usage(chunk.usage, CHAT_MODEL)
+                    continue
+                delta = chunk.choices[0].delta
+                if delta.content:
+                    content_parts.append(delta.content)
+                    yield sse_event("token", {"content": delta.content})
+                if delta.tool_calls:
+                    _collect_tool_call_delta(pending, delta.tool_calls)
+
+            if not pending:
+                response_text = "".join(content_parts)
+                break
+
+            from openai.types.chat import ChatCompletionMessageToolCall
+
+            tool_calls = [
+                ChatCompletionMessageToolCall(
+                    id=call["id"],
+                    type="function",
+                    function={"name": call["name"], "arguments": call["arguments"]},
+                )
+                for _, call in sorted(pending.items())
+            ]
+            logger.debug(f"Tool Calls: {tool_calls}")
+            for tool_call in tool_calls:
+                yield sse_event("tool", {"name": tool_call.function.name})
+
+            with timed(chat_stage_seconds, stage="stream_tools"):
+                results = await handle_function_calls(tool_calls)
+
+            messages.append({
+                "role": "assistant",
+                "content": "".join(content_parts) or None,
+                "tool_calls": [tool_call.model_dump() for tool_call in tool_calls],
+            })
+            for tool_call, result in zip(tool_calls, results):
+                messages.append({
+                    "role": "tool",
+                    "tool_call_id": tool_call.id,
+                    "content": str(result),
+                })
+            # Follow-up round answers from the tool results, without tools
+            tools = None
+    except Exception as e:
+        logger.error(f"Streaming chat failed: {e}")
+        yield sse_event("error", {"message": "The agent failed to respond."})
+        return
+
+    yield sse_event("done", {"response": response_text})
+    await on_complete(messages, response_text)
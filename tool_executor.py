@@ -0,0 +1,119 @@
+# tool_executor.py
+import asyncio
+import functools
+import logging
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from config import (
+    TOOL_THREAD_WORKERS,
+    TOOL_PROCESS_WORKERS,
+    TOOL_QUEUE_DEPTH,
+    TOOL_ADMIT_TIMEOUT,
+    TOOL_TIMEOUT,
+)
+
+logger = logging.getLogger(__name__)
+
+ASYNC = "async"
+THREAD = "thread"
+PROCESS = "process"
+
+
+class ToolBusyError(Exception):
+    """Raised when a tool pool is saturated and the call could not be admitted in time."""
+
+
+class _Pool:
+    """
+    An executor plus a slot semaphore bounding running and queued calls.
+    A slot is released only when the work itself finishes, so calls that
+    time out but keep running in a worker still count against the pool.
+    """
+
+    def __init__(self, name: str, factory: Callable[[], Executor], workers: int, queue_depth: int):
+        self.name = name
+        self.factory = factory
+        self.workers = workers
+        self.slots = asyncio.Semaphore(workers + queue_depth)
+        self.executor: Optional[Executor] = None
+
+    def start(self) -> Executor:
+        if self.executor is None:
+            self.executor = self.factory()
+        return self.executor
+
+    def shutdown(self) -> None:
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+
+class ToolExecutor:
+    """
+    Runs tools according to their declared mode: coroutines on the event loop,
+    blocking functions in a bounded thread pool, CPU-bound functions in a
+    process pool. Every call gets a timeout; saturated pools reject new calls
+    after TOOL_ADMIT_TIMEOUT instead of queueing without bound.
+    """
+
+    def __init__(
+        self,
+        thread_workers: int = TOOL_THREAD_WORKERS,
+        process_workers: int = TOOL_PROCESS_WORKERS,
+        queue_depth: int = TOOL_QUEUE_DEPTH,
+        admit_timeout: float = TOOL_ADMIT_TIMEOUT,
+    ):
+        self.admit_timeout = admit_timeout
+        self._pools: Dict[str, _Pool] = {
+            THREAD: _Pool(
+                THREAD,
+                lambda: ThreadPoolExecutor(max_workers=thread_workers, thread_name_prefix="tool"),
+                thread_workers,
+                queue_depth,
+            ),
+            PROCESS: _Pool(
+                PROCESS,
+                lambda: ProcessPoolExecutor(max_workers=process_workers),
+                process_workers,
+                queue_depth,
+            ),
+        }
+
+    def start(self) -> None:
+        # The process pool is started on first use; most deployments never need it
+        self._pools[THREAD].start()
+
+    def shutdown(self) -> None:
+        for pool in self._pools.values():
+            pool.shutdown()
+
+    async def run(self, func: Callable[..., Any], args: Dict[str, Any], mode: str = ASYNC, timeout: float = TOOL_TIMEOUT) -> Any:
+        if mode == ASYNC:
+            return await asyncio.wait_for(func(**args), timeout)
+
+        pool = self._pools[mode]
+        try:
+            await asyncio.wait_for(pool.slots.acquire(), self.admit_timeout)
+        except asyncio.TimeoutError:
+            raise ToolBusyError(f"{pool.name} pool is saturated")
+
+        loop = asyncio.get_running_loop()
+        try:
+            work = pool.start().submit(functools.partial(func, **args))
+        except BaseException:
+            pool.slots.release()
+            raise
+
+        def release(_: Any) -> None:
+            # Work that outlived its timeout may finish after the loop is gone
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(pool.slots.release)
+
+        work.add_done_callback(release)
+
+        # Cancelling the wrapper cancels work that has not started yet
+        return await asyncio.wait_for(asyncio.wrap_future(work), timeout)
+
+
+tool_executor = ToolExecutor()
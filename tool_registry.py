@@ -0,0 +1,177 @@
+# tool_registry.py
+import asyncio
+import inspect
+import re
+import typing
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Type
+
+from pydantic import BaseModel, create_model
+from pydantic.fields import FieldInfo
+
+from tool_executor import ASYNC, THREAD
+from config import tool_timeout
+
+JSON_SCHEMA_TYPES = {
+    str: "string",
+    int: "integer",
+    float: "number",
+    bool: "boolean",
+}
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+class ToolSpec:
+    """
+    A registered tool: the function, its OpenAI schema and a precompiled
+    Pydantic model that parses and coerces JSON arguments in one pass.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable[..., Any],
+        description: str,
+        model: Type[BaseModel],
+        schema: Dict[str, Any],
+        mode: str,
+        timeout: float,
+        keywords: Tuple[str, ...],
+        structured: bool = False,
+    ):
+        self.name = name
+        self.func = func
+        self.description = description
+        self.model = model
+        self.schema = schema
+        self.mode = mode
+        self.timeout = timeout
+        self.keywords = keywords
+        self.structured = structured
+        self.param_names = tuple(model.model_fields)
+
+    def parse_arguments(self, arguments: str) -> Dict[str, Any]:
+        """
+        Parses and validates the LLM's JSON argument string. Raises pydantic.ValidationError.
+        """
+        return self.model.model_validate_json(arguments or "{}").model_dump()
+
+
+def _unwrap(hint: Any) -> Tuple[Any, Optional[FieldInfo]]:
+    field = None
+    if typing.get_origin(hint) is typing.Annotated:
+        hint, *metadata = typing.get_args(hint)
+        field = next((item for item in metadata if isinstance(item, FieldInfo)), None)
+    if typing.get_origin(hint) is typing.Union:
+        # Optional[X] -> X; optionality comes from the parameter default
+        args = [arg for arg in typing.get_args(hint) if arg is not type(None)]
+        if len(args) == 1:
+            hint = args[0]
+    return hint, field
+
+
+def _build(name: str, func: Callable[..., Any], description: str) -> Tuple[Type[BaseModel], Dict[str, Any]]:
+    hints = typing.get_type_hints(func, include_extras=True)
+    fields: Dict[str, Any] = {}
+    properties: Dict[str, Any] = {}
+    required: List[str] = []
+
+    for param in inspect.signature(func).parameters.values():
+        hint = hints.get(param.name)
+        base, field = _unwrap(hint)
+        if base not in JSON_SCHEMA_TYPES:
+            raise TypeError(f"Tool `{name}` parameter `{param.name}` has unsupported type {hint!r}")
+
+        has_default = param.default is not inspect.Parameter.empty
+        fields[param.name] = (hint, param.default if has_default else ...)
+        properties[param.name] = {"type": JSON_SCHEMA_TYPES[base]}
+        if field is not None and field.description:
+            properties[param.name]["description"] = field.description
+        if not has_default:
+            required.append(param.name)
+
+    model_name = "".join(part.capitalize() for part in name.split("_")) + "Arguments"
+    model = create_model(model_name, **fields)
+    schema = {
+        "type": "function",
+        "function": {
+            "name": name,
+            "description": description,
+            "parameters": {
+                "type": "object",
+                "properties": properties,
+                "required": required,
+            },
+        },
+    }
+    return model, schema
+
+
+class ToolRegistry:
+    """
+    Single source of truth for tools. Registering a typed function builds its
+    schema, argument model and execution settings once, at import time.
+    """
+
+    def __init__(self):
+        self._tools: Dict[str, ToolSpec] = {}
+
+    def tool(
+        self,
+        description: str,
+        name: Optional[str] = None,
+        mode: Optional[str] = None,
+        keywords: Iterable[str] = (),
+        structured: bool = False,
+    ) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+        """
+        Decorator registering a function as a tool. Parameter descriptions come
+        from `Annotated[type, Field(description=...)]`; `keywords` drive tool selection
+        and `structured` also exposes the tool as a typed endpoint.
+        """
+        def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+            tool_name = name or func.__name__
+            if tool_name in self._tools:
+                raise ValueError(f"Tool `{tool_name}` is already registered")
+            model, schema = _build(tool_name, func, description)
+            self._tools[tool_name] = ToolSpec(
+                name=tool_name,
+                func=func,
+                description=description,
+                model=model,
+                schema=schema,
+                mode=mode or (ASYNC if asyncio.iscoroutinefunction(func) else THREAD),
+                timeout=tool_timeout(tool_name),
+                keywords=tuple(keyword.lower() for keyword in keywords),
+                structured=structured,
+            )
+            return func
+
+        return decorator
+
+    def get(self, name: str) -> Optional[ToolSpec]:
+        return self._tools.get(name)
+
+    def __getitem__(self, name: str) -> ToolSpec:
+        return self._tools[name]
+
+    def __iter__(self):
+        return iter(self._tools.values())
+
+    def schemas(self) -> List[Dict[str, Any]]:
+        return [spec.schema for spec in self._tools.values()]
+
+    def select(self, text: str) -> List[Dict[str, Any]]:
+        """
+        Schemas of the tools whose keywords occur in the text, in registration order.
+        """
+        words = set(_WORD_RE.findall(text.lower()))
+        return [
+            spec.schema
+            for spec in self._tools.values()
+            if any(keyword in words for keyword in spec.keywords)
+        ]
+
+
+tool_registry = ToolRegistry()
+tool = tool_registry.tool
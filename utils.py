@@ -1,67 +1,130 @@
 # utils.py
-import json
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, TYPE_CHECKING
 import asyncio
+import threading
+import time
 
-from openai import AsyncOpenAI
-from functions import add, greet, weather, micro, agtech, nano
-from tools import get_tools
-from config import OPENAI_API_KEY
+from pydantic import ValidationError
 
-# OpenAI client setup
-openai_client = AsyncOpenAI(api_key=OPENAI_API_KEY)
+# Importing functions registers every tool with the registry
+import functions  # noqa: F401
+from tool_registry import tool_registry
+from score_cache import score_cache
+from metrics import timed, record_usage, llm_request_seconds, tool_call_seconds
+from tool_executor import tool_executor, ToolBusyError
+from config import OPENAI_API_KEY, OPENAI_BASE_URL, TOOL_CONCURRENCY
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
+
+# OpenAI client setup; importing openai is the largest part of app import time
+_openai_client: Optional["AsyncOpenAI"] = None
+_openai_client_lock = threading.Lock()
+CHAT_MODEL = "gpt-4"
+
+
+def get_openai_client() -> "AsyncOpenAI":
+    """
+    The shared OpenAI client, created on first use.
+    """
+    global _openai_client
+    if _openai_client is None:
+        with _openai_client_lock:
+            if _openai_client is None:
+                from openai import AsyncOpenAI
+
+                _openai_client = AsyncOpenAI(api_key=OPENAI_API_KEY, base_url=OPENAI_BASE_URL)
+    return _openai_client
 
-# Map tool names to functions
-function_map = {
-    "add": add,
-    "greet": greet,
-    "weather": weather,
-    "micro": micro,
-    "nano": nano,
-    "agtech": agtech,
-}
 
 async def call_openai_chat(
     messages: List[Dict[str, Any]],
-    tools: Optional[List[Dict[str, Any]]] = None
+    tools: Optional[List[Dict[str, Any]]] = None,
+    stream: bool = False
 ) -> Any:
     """
     Calls OpenAI Chat API with optional tool support.
+    With stream=True, returns an async iterator of completion chunks.
     """
     request_params = {
-        "model": "gpt-4",
+        "model": CHAT_MODEL,
         "messages": messages,
     }
 
+    if stream:
+        request_params["stream"] = True
+        # The final chunk then carries the token usage, recorded by the consumer
+        request_params["stream_options"] = {"include_usage": True}
+
     if tools:
         request_params["tools"] = tools
         request_params["tool_choice"] = "auto"
 
-    return await openai_client.chat.completions.create(**request_params)
+    # For streams this times the call until the first chunk can be read
+    # During the startup warm-up, wait for the client in a thread rather than on the loop
+    client = _openai_client or await asyncio.to_thread(get_openai_client)
+    with timed(llm_request_seconds, model=request_params["model"], stream=str(stream).lower()):
+        response = await client.chat.completions.create(**request_params)
+    if not stream:
+        record_usage(response.usage, request_params["model"])
+    return response
+
+async def call_tool(name: str, args: Dict[str, Any]) -> Any:
+    """
+    Runs a tool by name with already-parsed arguments. Errors propagate to the caller.
+    """
+    spec = tool_registry[name]
+
+    def run() -> Any:
+        return tool_executor.run(spec.func, args, spec.mode, spec.timeout)
+
+    if score_cache.caches(name):
+        # Repeat scores for the same applicant are served from the cache
+        return await score_cache.get_or_call(name, args, run)
+    return await run()
 
 async def handle_function_call(tool_call: Any) -> Any:
     """
     Handles the tool function call triggered by the LLM.
     """
     name = tool_call.function.name
+    spec = tool_registry.get(name)
+    if spec is None:
+        return f"Function `{name}` not found."
+
+    # Parses the JSON and coerces argument types in a single pass
     try:
-        args = json.loads(tool_call.function.arguments)
-    except Exception as e:
+        args = spec.parse_arguments(tool_call.function.arguments)
+    except ValidationError as e:
         return f"Error parsing arguments: {str(e)}"
 
-    func = function_map.get(name)
-    if not func:
-        return f"Function `{name}` not found."
-
+    started = time.perf_counter()
     try:
-        if callable(func):
-            # Check if the function is a coroutine (async)
-            if asyncio.iscoroutinefunction(func):
-                result = await func(**args)  # Await async functions
-            else:
-                result = func(**args)  # Call sync functions directly
-            return result
-        else:
-            return f"Function `{name}` is not callable."
+        result = await call_tool(name, args)
+    except asyncio.TimeoutError:
+        tool_call_seconds.observe(time.perf_counter() - started, tool=name, outcome="timeout")
+        return f"Error executing `{name}`: timed out after {spec.timeout}s"
+    except ToolBusyError as e:
+        tool_call_seconds.observe(time.perf_counter() - started, tool=name, outcome="rejected")
+        return f"Error executing `{name}`: {str(e)}, try again shortly"
     except Exception as e:
-        return f"Error executing `{name}`: {str(e)}"
\ No newline at end of file
+        tool_call_seconds.observe(time.perf_counter() - started, tool=name, outcome="error")
+        return f"Error executing `{name}`: {str(e)}"
+    tool_call_seconds.observe(time.perf_counter() - started, tool=name, outcome="ok")
+    return result
+
+async def handle_function_calls(
+    tool_calls: List[Any],
+    max_concurrency: int = TOOL_CONCURRENCY
+) -> List[Any]:
+    """
+    Runs several tool calls concurrently and returns their results in call order.
+    Per-tool timeouts are enforced by the tool executor.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def run(tool_call: Any) -> Any:
+        async with semaphore:
+            return await handle_function_call(tool_call)
+
+    return await asyncio.gather(*(run(tool_call) for tool_call in tool_calls))